@@ -0,0 +1,83 @@
+"""Memory held per parsed upload, before and after the columnar dataset.
+
+Usage: python benchmarks/memory_benchmark.py [--rows N]
+
+Allocations are counted with tracemalloc (NumPy reports its buffers to it)
+and scaled to MiB per million rows. A cached upload holds the dataset, its
+DatasetIndex and the name search index.
+"""
+import argparse
+import gc
+import io
+import os
+import sys
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from equipment.dataset import EquipmentDataset  # noqa: E402
+from equipment.indexes import DatasetIndex  # noqa: E402
+from equipment.search import NameSearchIndex  # noqa: E402
+
+TYPES = ['Pump', 'Reactor', 'Compressor', 'Heat Exchanger', 'Distillation Column']
+
+
+def sample_csv(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'Equipment Name': [f'Unit-{i}' for i in range(rows)],
+        'Type': np.array(TYPES)[rng.integers(0, len(TYPES), rows)],
+        'Flowrate': rng.uniform(50, 500, rows).round(2),
+        'Pressure': rng.uniform(1, 100, rows).round(1),
+        'Temperature': rng.integers(20, 600, rows).astype(float),
+    })
+    return df.to_csv(index=False)
+
+
+def measure(build, *args):
+    gc.collect()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build(*args)
+    gc.collect()
+    return result, tracemalloc.get_traced_memory()[0] - before
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    args = parser.parse_args(argv)
+
+    text = sample_csv(args.rows)
+    tracemalloc.start()
+    frame, frame_bytes = measure(lambda: pd.read_csv(io.StringIO(text)))
+    records, records_bytes = measure(frame.to_dict, 'records')
+    del records
+    dataset, dataset_bytes = measure(EquipmentDataset, frame)
+    index, index_bytes = measure(DatasetIndex, dataset)
+    # Warmed at ingest along with the rest of the index, so it is held for
+    # every cached upload too.
+    search, search_bytes = measure(NameSearchIndex, dataset.names, dataset.name_codes)
+    rows, rows_bytes = measure(dataset.rows)
+    tracemalloc.stop()
+
+    scale = 1_000_000 / args.rows / 2**20
+    print(f'{args.rows} rows; MiB per 1M rows')
+    print('  before')
+    print(f'    DataFrame from read_csv       {frame_bytes * scale:8.1f}')
+    print(f"    to_dict('records')            {records_bytes * scale:8.1f}")
+    print('  after')
+    print(f'    EquipmentDataset              {dataset_bytes * scale:8.1f}')
+    print(f'      numeric dtypes: {", ".join(f"{c}={v.dtype}" for c, v in dataset.numeric.items())}')
+    print(f'    DatasetIndex (without search) {index_bytes * scale:8.1f}')
+    print(f'    NameSearchIndex               {search_bytes * scale:8.1f}')
+    print(f'    row views for all rows        {rows_bytes * scale:8.1f}')
+    cached = dataset_bytes + index_bytes + search_bytes
+    print(f'  held per cached upload          {cached * scale:8.1f}')
+    del rows, index, search
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,162 @@
+"""Startup cost of the Django app: import time and per-worker memory.
+
+Usage: python benchmarks/startup_benchmark.py [--runs N] [--workers N]
+
+Import time is measured in fresh interpreters, once as the app loads today
+and once with pandas/ReportLab imported eagerly, as views.py used to. Worker
+memory is read from /proc for gunicorn workers with and without the pre-fork
+warmup (EQUIPMENT_PRELOAD=1), right after boot and again after every worker
+has served history, latest and PDF requests. Uploads the sample CSV once if
+the database has no upload yet, so run it against a development database.
+"""
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+import requests
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SAMPLE_CSV = os.path.join(BACKEND_DIR, '..', 'sample_equipment_data.csv')
+
+IMPORT_SNIPPET = """
+import os, sys, time
+started = time.perf_counter()
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+if {eager}:
+    import pandas, reportlab.platypus
+import django
+django.setup()
+import config.urls
+elapsed = time.perf_counter() - started
+loaded = [name for name in ('pandas', 'numpy', 'reportlab') if name in sys.modules]
+print(elapsed, ','.join(loaded))
+"""
+
+
+def measure_import(eager, runs):
+    timings = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, '-c', IMPORT_SNIPPET.format(eager=eager)],
+            cwd=BACKEND_DIR, capture_output=True, text=True, check=True,
+        ).stdout.split()
+        timings.append(float(output[0]))
+    return statistics.median(timings) * 1000, output[1] if len(output) > 1 else '-'
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def read_memory(pid):
+    # smaps_rollup gives PSS, which splits shared pages between the processes
+    # mapping them, so it shows what copy-on-write sharing actually saves.
+    values = {}
+    with open(f'/proc/{pid}/smaps_rollup') as handle:
+        for line in handle:
+            parts = line.split()
+            if parts[0] in ('Rss:', 'Pss:', 'Private_Clean:', 'Private_Dirty:'):
+                values[parts[0].rstrip(':')] = int(parts[1]) / 1024
+    return {
+        'rss': values['Rss'],
+        'pss': values['Pss'],
+        'private': values['Private_Clean'] + values['Private_Dirty'],
+    }
+
+
+def worker_pids(master_pid):
+    pids = []
+    for task in os.listdir(f'/proc/{master_pid}/task'):
+        with open(f'/proc/{master_pid}/task/{task}/children') as handle:
+            pids.extend(int(pid) for pid in handle.read().split())
+    return pids
+
+
+def summarize(master_pid):
+    workers = [read_memory(pid) for pid in worker_pids(master_pid)]
+    master = read_memory(master_pid)
+    average = {key: statistics.mean(worker[key] for worker in workers) for key in workers[0]}
+    total_pss = master['pss'] + sum(worker['pss'] for worker in workers)
+    return average, total_pss
+
+
+def wait_until_up(base_url, process, timeout=60):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError('gunicorn exited during startup')
+        try:
+            requests.get(f'{base_url}/api/history/', timeout=2)
+            return
+        except requests.ConnectionError:
+            time.sleep(0.2)
+    raise RuntimeError('gunicorn did not start in time')
+
+
+def exercise(base_url, workers):
+    session = requests.Session()
+    if session.get(f'{base_url}/api/latest/').status_code == 404:
+        with open(SAMPLE_CSV, 'rb') as handle:
+            session.post(f'{base_url}/api/upload/', files={'file': handle}).raise_for_status()
+    # Fresh connections spread the requests over the workers.
+    for _ in range(workers * 8):
+        for endpoint in ('history/', 'latest/', 'pdf/'):
+            requests.get(f'{base_url}/api/{endpoint}').raise_for_status()
+
+
+def measure_workers(preload, workers):
+    port = free_port()
+    base_url = f'http://127.0.0.1:{port}'
+    env = dict(
+        os.environ,
+        EQUIPMENT_PRELOAD='1' if preload else '0',
+        GUNICORN_BIND=f'127.0.0.1:{port}',
+        GUNICORN_WORKERS=str(workers),
+    )
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '--config', 'gunicorn.conf.py'],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        wait_until_up(base_url, process)
+        time.sleep(1)
+        booted = summarize(process.pid)
+        exercise(base_url, workers)
+        time.sleep(1)
+        served = summarize(process.pid)
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+    return booted, served
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--workers', type=int, default=4)
+    args = parser.parse_args(argv)
+
+    print(f'Import of config.urls (median of {args.runs} fresh interpreters)')
+    for label, eager in (('eager', True), ('lazy', False)):
+        milliseconds, loaded = measure_import(eager, args.runs)
+        print(f'  {label:<6} {milliseconds:7.0f} ms   heavy modules loaded: {loaded}')
+
+    print(f'\nGunicorn, {args.workers} workers (MiB; per-worker averages, PSS total includes master)')
+    print(f'  {"mode":<16}{"phase":<8}{"RSS":>8}{"PSS":>8}{"private":>9}{"PSS total":>11}')
+    for label, preload in (('lazy', False), ('preload+warmup', True)):
+        booted, served = measure_workers(preload, args.workers)
+        for phase, (average, total_pss) in (('boot', booted), ('served', served)):
+            print(
+                f'  {label:<16}{phase:<8}{average["rss"]:8.1f}{average["pss"]:8.1f}'
+                f'{average["private"]:9.1f}{total_pss:11.1f}'
+            )
+
+
+if __name__ == '__main__':
+    main()
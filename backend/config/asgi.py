@@ -0,0 +1,18 @@
+import os
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+django_application = get_asgi_application()
+
+from django.urls import reverse  # noqa: E402
+from equipment.events import sse_application  # noqa: E402
+
+EVENTS_PATH = reverse('upload_events')
+
+async def application(scope, receive, send):
+    # Event streams are long-lived and idle; serve them outside Django so
+    # each one costs a coroutine rather than a thread.
+    if scope['type'] == 'http' and scope['path'] == EVENTS_PATH:
+        await sse_application(scope, receive, send)
+    else:
+        await django_application(scope, receive, send)
@@ -0,0 +1,127 @@
+import io
+import multiprocessing
+import os
+import threading
+import zipfile
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+BATCH_PARSE_WORKERS = int(os.getenv('EQUIPMENT_BATCH_WORKERS', '0')) or min(4, os.cpu_count() or 1)
+MAX_BATCH_FILES = 100
+# Archive members are read into memory, so refuse any that inflate past this.
+MAX_ARCHIVE_MEMBER_SIZE = 100 * 1024 * 1024
+# Every CSV of a batch is held in memory until it is stored, so the batch as
+# a whole is capped too, counting archive members at their inflated size.
+MAX_BATCH_BYTES = 512 * 1024 * 1024
+
+class _BatchBudget:
+    # Checked before each file or member is read, so an oversized batch is
+    # refused without inflating the rest of it.
+    def __init__(self):
+        self.files = 0
+        self.bytes = 0
+
+    def admit(self, size):
+        self.files += 1
+        if self.files > MAX_BATCH_FILES:
+            raise ValueError(f'A batch may contain at most {MAX_BATCH_FILES} files')
+        self.bytes += size
+        if self.bytes > MAX_BATCH_BYTES:
+            raise ValueError(f'A batch may contain at most {MAX_BATCH_BYTES // (1024 * 1024)} MB of CSV data')
+
+def _archive_entries(archive, budget):
+    try:
+        with zipfile.ZipFile(archive) as bundle:
+            entries = []
+            for info in bundle.infolist():
+                if info.is_dir():
+                    continue
+                label = f'{archive.name}/{info.filename}'
+                if not info.filename.endswith('.csv'):
+                    budget.admit(0)
+                    entries.append({'file': label, 'error': 'File must be a CSV'})
+                elif info.file_size > MAX_ARCHIVE_MEMBER_SIZE:
+                    budget.admit(0)
+                    entries.append({'file': label, 'error': 'File is too large'})
+                else:
+                    budget.admit(info.file_size)
+                    # A corrupt, truncated, encrypted or unsupported member
+                    # only fails itself.
+                    try:
+                        data = bundle.read(info)
+                    except EOFError:
+                        entries.append({'file': label, 'error': 'Could not extract file: archive is truncated'})
+                        continue
+                    except (zipfile.BadZipFile, RuntimeError, zlib.error, NotImplementedError) as e:
+                        entries.append({'file': label, 'error': f'Could not extract file: {e}'})
+                        continue
+                    entries.append({'file': label, 'name': os.path.basename(info.filename), 'data': data})
+            return entries
+    except (zipfile.BadZipFile, RuntimeError) as e:
+        return [{'file': archive.name, 'error': f'Invalid zip archive: {e}'}]
+
+def expand_batch_files(uploaded_files):
+    # One entry per CSV in request order; a zip archive contributes one
+    # entry per member. Entries that cannot be parsed carry an 'error'.
+    # Raises ValueError once the batch exceeds its file or size limit.
+    budget = _BatchBudget()
+    entries = []
+    for uploaded in uploaded_files:
+        if uploaded.name.lower().endswith('.zip'):
+            entries.extend(_archive_entries(uploaded, budget))
+        elif uploaded.name.endswith('.csv'):
+            budget.admit(uploaded.size)
+            entries.append({'file': uploaded.name, 'name': uploaded.name, 'data': uploaded.read()})
+        else:
+            budget.admit(0)
+            entries.append({'file': uploaded.name, 'error': 'File must be a CSV'})
+    return entries
+
+def parse_batch_file(data):
+    from .views import read_equipment_csv, summarize_frame
+    
+    df, error = read_equipment_csv(io.BytesIO(data))
+    if error:
+        return {'error': error}
+    try:
+        stats, aggregates = summarize_frame(df)
+    except Exception as e:
+        return {'error': str(e)}
+    return {'stats': stats, 'aggregates': aggregates}
+
+def _setup_worker():
+    import django
+    django.setup()
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def _get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # Spawned rather than forked: the server process may be running
+            # other request threads, and spawn also works on Windows.
+            _pool = ProcessPoolExecutor(
+                max_workers=BATCH_PARSE_WORKERS,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_setup_worker,
+            )
+        return _pool
+
+def parse_batch(entries):
+    # Parses every entry's CSV bytes, across the process pool when there is
+    # more than one, and returns the results in the same order.
+    payloads = [entry['data'] for entry in entries]
+    if len(payloads) < 2 or BATCH_PARSE_WORKERS < 2:
+        return [parse_batch_file(data) for data in payloads]
+    
+    global _pool
+    try:
+        return list(_get_pool().map(parse_batch_file, payloads))
+    except BrokenProcessPool:
+        # A crashed worker breaks the executor for good; start over next time.
+        with _pool_lock:
+            _pool = None
+        raise
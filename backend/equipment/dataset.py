@@ -0,0 +1,198 @@
+import numpy as np
+import pandas as pd
+
+NAME_COLUMN = 'Equipment Name'
+TYPE_COLUMN = 'Type'
+NUMERIC_COLUMNS = ['Flowrate', 'Pressure', 'Temperature']
+
+def _code_dtype(count):
+    # Smallest signed type holding codes 0..count-1 plus -1 for missing.
+    for dtype in (np.int8, np.int16, np.int32):
+        if count <= np.iinfo(dtype).max:
+            return dtype
+    return np.int64
+
+def _narrow_floats(values):
+    # float32 only when it round-trips every value exactly, so stats, filters
+    # and exports see the same numbers as the CSV.
+    narrowed = values.astype(np.float32)
+    if np.array_equal(narrowed.astype(np.float64), values, equal_nan=True):
+        return narrowed
+    return values
+
+def optional_value(value):
+    # NaN is the only value not equal to itself.
+    return None if value is None or value != value else value
+
+class StringTable:
+    # Each distinct string stored once, concatenated into a single str and
+    # addressed by code; a million short names cost a few bytes each instead
+    # of a Python object apiece.
+    __slots__ = ('text', 'offsets')
+
+    def __init__(self, values):
+        self.text = ''.join(values)
+        offsets = np.zeros(len(values) + 1, dtype=np.int64)
+        np.cumsum(np.fromiter(map(len, values), dtype=np.int64, count=len(values)), out=offsets[1:])
+        self.offsets = offsets.astype(np.int32) if offsets[-1] <= np.iinfo(np.int32).max else offsets
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, code):
+        return self.text[self.offsets[code]:self.offsets[code + 1]]
+
+    def tolist(self):
+        text = self.text
+        bounds = self.offsets.tolist()
+        return [text[start:stop] for start, stop in zip(bounds, bounds[1:])]
+
+    def lower(self):
+        lowered = StringTable.__new__(StringTable)
+        lowered.text = self.text.lower()
+        if len(lowered.text) == len(self.text):
+            lowered.offsets = self.offsets
+        else:
+            # A few characters change length when lowercased.
+            lowered.__init__([value.lower() for value in self.tolist()])
+        return lowered
+
+class EquipmentDataset:
+    """Columnar, read-only copy of a parsed upload.
+
+    Names are interned into a StringTable and Type into a category list, each
+    referenced by per-row integer codes; numeric columns are float32 when
+    that is lossless. Columns beyond the required ones are kept as-is.
+    """
+
+    def __init__(self, df):
+        self.size = len(df)
+        self.columns = [str(column) for column in df.columns]
+
+        name_codes, names = pd.factorize(df[NAME_COLUMN])
+        self.name_codes = name_codes.astype(_code_dtype(len(names)))
+        self.names = StringTable([str(name) for name in names])
+
+        type_codes, types = pd.factorize(df[TYPE_COLUMN])
+        self.type_codes = type_codes.astype(_code_dtype(len(types)))
+        self.type_names = [str(eq_type) for eq_type in types]
+
+        self.numeric = {}
+        self.integral = set()
+        for column in NUMERIC_COLUMNS:
+            values = pd.to_numeric(df[column], errors='coerce')
+            if pd.api.types.is_integer_dtype(values):
+                self.integral.add(column)
+            self.numeric[column] = _narrow_floats(values.to_numpy(dtype=np.float64))
+
+        required = {NAME_COLUMN, TYPE_COLUMN, *NUMERIC_COLUMNS}
+        self.extra = {
+            str(column): df[column].astype(object).where(df[column].notna(), None).to_numpy()
+            for column in df.columns if column not in required
+        }
+
+        self._getters = {NAME_COLUMN: self.name, TYPE_COLUMN: self.equipment_type}
+        for column in NUMERIC_COLUMNS:
+            self._getters[column] = self._numeric_getter(column)
+        for column, values in self.extra.items():
+            self._getters[column] = values.__getitem__
+
+    def __len__(self):
+        return self.size
+
+    def name(self, row):
+        code = self.name_codes[row]
+        return None if code < 0 else self.names[code]
+
+    def equipment_type(self, row):
+        code = self.type_codes[row]
+        return None if code < 0 else self.type_names[code]
+
+    def _numeric_getter(self, column):
+        values = self.numeric[column]
+        cast = int if column in self.integral else float
+
+        def get(row):
+            value = values[row]
+            return None if value != value else cast(value)
+        return get
+
+    def name_list(self):
+        names = self.names.tolist()
+        return [None if code < 0 else names[code] for code in self.name_codes.tolist()]
+
+    def column_values(self, column, ids):
+        # Plain Python values for a batch of rows, missing values as None.
+        if column == NAME_COLUMN:
+            codes = self.name_codes[ids].tolist()
+            return [None if code < 0 else self.names[code] for code in codes]
+        if column == TYPE_COLUMN:
+            codes = self.type_codes[ids].tolist()
+            return [None if code < 0 else self.type_names[code] for code in codes]
+        if column in self.numeric:
+            values = self.numeric[column][ids].astype(np.float64).tolist()
+            if column in self.integral:
+                return [None if value != value else int(value) for value in values]
+            return [optional_value(value) for value in values]
+        return self.extra[column][ids].tolist()
+
+    def row_tuples(self, ids):
+        return zip(*(self.column_values(column, ids) for column in self.columns))
+
+    def row(self, row):
+        return EquipmentRow(self, int(row))
+
+    def rows(self, ids=None):
+        if ids is None:
+            ids = range(self.size)
+        elif isinstance(ids, np.ndarray):
+            ids = ids.tolist()
+        return [EquipmentRow(self, row) for row in ids]
+
+class EquipmentRow:
+    # Lightweight view of one dataset row. It reads like a mapping keyed by
+    # CSV column, which is also how the JSON renderer serialises it.
+    __slots__ = ('dataset', 'index')
+
+    def __init__(self, dataset, index):
+        self.dataset = dataset
+        self.index = index
+
+    def keys(self):
+        return self.dataset.columns
+
+    def __getitem__(self, column):
+        try:
+            getter = self.dataset._getters[column]
+        except KeyError:
+            raise KeyError(column) from None
+        return getter(self.index)
+
+    def __iter__(self):
+        return iter(self.dataset.columns)
+
+    def __len__(self):
+        return len(self.dataset.columns)
+
+    @property
+    def name(self):
+        return self.dataset.name(self.index)
+
+    @property
+    def equipment_type(self):
+        return self.dataset.equipment_type(self.index)
+
+    @property
+    def flowrate(self):
+        return self['Flowrate']
+
+    @property
+    def pressure(self):
+        return self['Pressure']
+
+    @property
+    def temperature(self):
+        return self['Temperature']
+
+    def to_dict(self):
+        return {column: self[column] for column in self.dataset.columns}
@@ -0,0 +1,196 @@
+import asyncio
+import json
+import os
+import queue
+import socket
+import threading
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+# Events a subscriber may fall behind by before the oldest are dropped.
+SUBSCRIBER_BUFFER = 100
+KEEPALIVE_SECONDS = 15
+RETRY_MILLISECONDS = 3000
+# Largest event relayed between worker processes; events carry summary
+# stats only, so this is far more than needed.
+RELAY_MAX_MESSAGE = 64 * 1024
+
+def _offer(buffer, message):
+    # Slow consumers lose their oldest events rather than growing unbounded.
+    while True:
+        try:
+            buffer.put_nowait(message)
+            return
+        except (asyncio.QueueFull, queue.Full):
+            try:
+                buffer.get_nowait()
+            except (asyncio.QueueEmpty, queue.Empty):
+                pass
+
+class AsyncSubscriber:
+    def __init__(self):
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=SUBSCRIBER_BUFFER)
+
+    def deliver(self, message):
+        self.loop.call_soon_threadsafe(_offer, self.queue, message)
+
+    async def get(self, timeout):
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+class ThreadSubscriber:
+    # Used under WSGI, where each open stream holds a worker thread anyway.
+    def __init__(self):
+        self.queue = queue.Queue(maxsize=SUBSCRIBER_BUFFER)
+
+    def deliver(self, message):
+        _offer(self.queue, message)
+
+    def get(self, timeout):
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+class EventRelay:
+    # Forwards events between the worker processes of one server. Each binds
+    # a Unix datagram socket in a shared directory and sends every event it
+    # publishes to all the others' sockets.
+    def __init__(self, directory, deliver):
+        self.directory = directory
+        self.path = os.path.join(directory, f'{os.getpid()}.sock')
+        self.deliver = deliver
+        self.receiver = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self.receiver.bind(self.path)
+        # A peer that stops reading drops events instead of blocking uploads.
+        self.sender = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self.sender.setblocking(False)
+        threading.Thread(target=self._receive, name='event-relay', daemon=True).start()
+
+    def _receive(self):
+        while True:
+            try:
+                data = self.receiver.recv(RELAY_MAX_MESSAGE)
+            except OSError:
+                return
+            self.deliver(data.decode('utf-8'))
+
+    def send(self, message):
+        data = message.encode('utf-8')
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if path == self.path:
+                continue
+            try:
+                self.sender.sendto(data, path)
+            except (ConnectionRefusedError, FileNotFoundError):
+                # Left behind by a worker that has exited.
+                try:
+                    os.unlink(path)
+                except OSError:
+                    pass
+            except OSError:
+                pass
+
+    def close(self):
+        try:
+            os.unlink(self.path)
+        except OSError:
+            pass
+        self.receiver.close()
+        self.sender.close()
+
+class EventBroker:
+    # In-process fan-out: each event is encoded once and handed to every
+    # subscriber of this process. Separate worker processes only see each
+    # other's events once they have joined a relay.
+    def __init__(self):
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._relay = None
+
+    def join_relay(self, directory):
+        self._relay = EventRelay(directory, self._deliver)
+
+    def leave_relay(self):
+        if self._relay is not None:
+            self._relay.close()
+            self._relay = None
+
+    def subscribe(self, subscriber):
+        with self._lock:
+            self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    @property
+    def subscriber_count(self):
+        with self._lock:
+            return len(self._subscribers)
+
+    def publish(self, event_type, payload):
+        data = json.dumps(payload, cls=DjangoJSONEncoder, separators=(',', ':'))
+        message = f"event: {event_type}\ndata: {data}\n\n"
+        self._deliver(message)
+        relay = self._relay
+        if relay is not None:
+            relay.send(message)
+
+    def _deliver(self, message):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            subscriber.deliver(message)
+
+broker = EventBroker()
+
+SSE_HEADERS = [
+    (b'content-type', b'text/event-stream'),
+    (b'cache-control', b'no-cache'),
+    (b'x-accel-buffering', b'no'),
+    (b'access-control-allow-origin', b'*'),
+]
+
+async def async_event_stream():
+    subscriber = broker.subscribe(AsyncSubscriber())
+    try:
+        yield f"retry: {RETRY_MILLISECONDS}\n\n"
+        while True:
+            message = await subscriber.get(KEEPALIVE_SECONDS)
+            yield message if message is not None else ": keepalive\n\n"
+    finally:
+        broker.unsubscribe(subscriber)
+
+def event_stream():
+    subscriber = broker.subscribe(ThreadSubscriber())
+    try:
+        yield f"retry: {RETRY_MILLISECONDS}\n\n"
+        while True:
+            message = subscriber.get(KEEPALIVE_SECONDS)
+            yield message if message is not None else ": keepalive\n\n"
+    finally:
+        broker.unsubscribe(subscriber)
+
+async def sse_application(scope, receive, send):
+    # Bare ASGI endpoint for the event feed. Going through Django's handler
+    # would keep a thread-sensitive executor thread alive for every open
+    # stream; here an idle subscriber is just a parked coroutine.
+    async def stream():
+        await send({'type': 'http.response.start', 'status': 200, 'headers': SSE_HEADERS})
+        async for chunk in async_event_stream():
+            await send({'type': 'http.response.body', 'body': chunk.encode('utf-8'), 'more_body': True})
+    
+    stream_task = asyncio.ensure_future(stream())
+    try:
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                break
+    finally:
+        stream_task.cancel()
@@ -0,0 +1,58 @@
+import csv
+import io
+import tempfile
+import zlib
+
+EXPORT_CHUNK_ROWS = 5000
+# XLSX is a zip archive and must be finalised before it can be sent, so it is
+# spooled to disk past this size instead of being held in memory.
+XLSX_SPOOL_SIZE = 8 * 1024 * 1024
+XLSX_READ_SIZE = 64 * 1024
+
+def iter_csv(dataset, ids, chunk_size=EXPORT_CHUNK_ROWS):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
+    writer.writerow(dataset.columns)
+    # The header goes out on its own so the client sees the response start
+    # before the first chunk of rows is formatted.
+    yield buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+    for start in range(0, len(ids), chunk_size):
+        writer.writerows(dataset.row_tuples(ids[start:start + chunk_size]))
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+def iter_gzip(chunks):
+    # wbits=31 produces a gzip container rather than a raw zlib stream.
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        if isinstance(chunk, str):
+            chunk = chunk.encode('utf-8')
+        # A sync flush per chunk ends each one on a byte boundary, so the
+        # client can decompress everything received so far instead of waiting
+        # for deflate's internal buffer to fill.
+        yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+    yield compressor.flush()
+
+def iter_xlsx(dataset, ids, chunk_size=EXPORT_CHUNK_ROWS):
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet('Equipment')
+    sheet.append(dataset.columns)
+    for start in range(0, len(ids), chunk_size):
+        for row in dataset.row_tuples(ids[start:start + chunk_size]):
+            sheet.append(list(row))
+
+    with tempfile.SpooledTemporaryFile(max_size=XLSX_SPOOL_SIZE) as handle:
+        workbook.save(handle)
+        handle.seek(0)
+        while True:
+            data = handle.read(XLSX_READ_SIZE)
+            if not data:
+                break
+            yield data
@@ -0,0 +1,60 @@
+from collections import Counter
+
+AGGREGATE_PREFIXES = ['flowrate', 'pressure', 'temperature']
+# 'rows' pools every row of every upload; 'uploads' gives each upload the
+# same say regardless of its size.
+WEIGHTINGS = ('rows', 'uploads')
+
+def needs_backfill(upload):
+    # Uploads created before running aggregates were stored have none; an
+    # append always materialises them, so only untouched uploads qualify.
+    return (
+        not upload.append_count
+        and upload.total_equipment > 0
+        and not upload.equipment_distribution
+        and not any(getattr(upload, f'{prefix}_count') for prefix in AGGREGATE_PREFIXES)
+    )
+
+def upload_partial(upload):
+    # The stored running sums and counts are already a mergeable partial.
+    partial = {
+        'total_equipment': upload.total_equipment,
+        'equipment_distribution': dict(upload.equipment_distribution),
+    }
+    for prefix in AGGREGATE_PREFIXES:
+        partial[f'{prefix}_sum'] = getattr(upload, f'{prefix}_sum')
+        partial[f'{prefix}_count'] = getattr(upload, f'{prefix}_count')
+    return partial
+
+def _mean(values):
+    return sum(values) / len(values) if values else 0.0
+
+def merge_partials(partials, weighting='rows'):
+    stats = {'total_equipment': sum(partial['total_equipment'] for partial in partials)}
+    for prefix in AGGREGATE_PREFIXES:
+        if weighting == 'uploads':
+            stats[f'average_{prefix}'] = _mean([
+                partial[f'{prefix}_sum'] / partial[f'{prefix}_count']
+                for partial in partials if partial[f'{prefix}_count']
+            ])
+        else:
+            count = sum(partial[f'{prefix}_count'] for partial in partials)
+            total = sum(partial[f'{prefix}_sum'] for partial in partials)
+            stats[f'average_{prefix}'] = total / count if count else 0.0
+    
+    distribution = Counter()
+    for partial in partials:
+        distribution.update(partial['equipment_distribution'])
+    stats['equipment_distribution'] = dict(distribution.most_common())
+    
+    if weighting == 'uploads':
+        typed = [partial['equipment_distribution'] for partial in partials if partial['equipment_distribution']]
+        shares = Counter()
+        for counts in typed:
+            size = sum(counts.values())
+            shares.update({eq_type: count / size / len(typed) for eq_type, count in counts.items()})
+    else:
+        size = sum(distribution.values())
+        shares = Counter({eq_type: count / size for eq_type, count in distribution.items()})
+    stats['equipment_share'] = dict(shares.most_common())
+    return stats
@@ -0,0 +1,185 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from .dataset import NUMERIC_COLUMNS
+from .search import NameSearchIndex
+
+# Indexes are kept for at most as many uploads as the retention policy keeps.
+INDEX_CACHE_SIZE = 5
+
+def _column_bound(values, bound, lower):
+    # Searching a float32 column needs a float32 bound that selects exactly
+    # the values a float64 comparison with ``bound`` would.
+    if values.dtype == np.float64:
+        return bound
+    with np.errstate(over='ignore'):
+        narrowed = values.dtype.type(bound)
+    if lower and float(narrowed) < bound:
+        narrowed = np.nextafter(narrowed, values.dtype.type(np.inf))
+    elif not lower and float(narrowed) > bound:
+        narrowed = np.nextafter(narrowed, values.dtype.type(-np.inf))
+    return narrowed
+
+class DatasetIndex:
+    # Read-only lookup structures built once per upload over its
+    # EquipmentDataset: a category -> row id map for Type and a sorted
+    # permutation per numeric column, so selective queries only touch the
+    # rows they match.
+    def __init__(self, dataset):
+        self.dataset = dataset
+        self.size = len(dataset)
+        self._name_search = None
+        self._name_search_lock = threading.Lock()
+        # Row ids are stored as int32 whenever the dataset allows it.
+        id_dtype = np.int32 if self.size <= np.iinfo(np.int32).max else np.intp
+
+        codes = dataset.type_codes
+        self.type_codes = codes
+        self.type_names = dataset.type_names
+        self.type_lookup = {name: code for code, name in enumerate(self.type_names)}
+        order = np.argsort(codes, kind='stable').astype(id_dtype)
+        bounds = np.searchsorted(codes[order], np.arange(len(self.type_names) + 1))
+        self.type_rows = [order[bounds[i]:bounds[i + 1]] for i in range(len(self.type_names))]
+
+        self.values = dataset.numeric
+        self.order = {}
+        self.sorted_values = {}
+        self.non_null = {}
+        for column in NUMERIC_COLUMNS:
+            values = self.values[column]
+            order = np.argsort(values, kind='stable').astype(id_dtype)
+            self.order[column] = order
+            self.sorted_values[column] = values[order]
+            self.non_null[column] = int(np.count_nonzero(~np.isnan(values)))
+
+    @property
+    def name_search(self):
+        if self._name_search is None:
+            with self._name_search_lock:
+                if self._name_search is None:
+                    self._name_search = NameSearchIndex(self.dataset.names, self.dataset.name_codes)
+        return self._name_search
+
+    def warm(self):
+        # Build the lazily constructed structures up front, e.g. at ingest.
+        return self.name_search
+
+    def _type_candidates(self, types):
+        codes = [self.type_lookup[name] for name in types if name in self.type_lookup]
+        if not codes:
+            return np.empty(0, dtype=np.intp)
+        if len(codes) == 1:
+            return self.type_rows[codes[0]]
+        return np.sort(np.concatenate([self.type_rows[code] for code in codes]))
+
+    def _range_slice(self, column, low, high):
+        sorted_values = self.sorted_values[column]
+        if low is None:
+            start = 0
+        else:
+            start = np.searchsorted(sorted_values, _column_bound(sorted_values, low, lower=True), side='left')
+        if high is None:
+            stop = self.non_null[column]
+        else:
+            stop = np.searchsorted(sorted_values, _column_bound(sorted_values, high, lower=False), side='right')
+        return self.order[column][start:stop]
+
+    def select(self, types=None, ranges=None):
+        # Returns (row ids, column the ids are already sorted by or None).
+        ranges = {column: bounds for column, bounds in (ranges or {}).items() if bounds != (None, None)}
+        candidates = []
+        if types is not None:
+            candidates.append((self._type_candidates(types), None, None))
+        for column, (low, high) in ranges.items():
+            candidates.append((self._range_slice(column, low, high), column, (low, high)))
+
+        if not candidates:
+            return np.arange(self.size), None
+
+        # Drive from the most selective predicate and check the rest row-wise.
+        candidates.sort(key=lambda candidate: len(candidate[0]))
+        ids, sorted_by, _ = candidates[0]
+        for other_ids, column, bounds in candidates[1:]:
+            if not len(ids):
+                break
+            if column is None:
+                codes = [self.type_lookup[name] for name in types if name in self.type_lookup]
+                mask = np.isin(self.type_codes[ids], codes)
+            else:
+                low, high = bounds
+                values = self.values[column][ids].astype(np.float64)
+                mask = ~np.isnan(values)
+                if low is not None:
+                    mask &= values >= low
+                if high is not None:
+                    mask &= values <= high
+            ids = ids[mask]
+        return ids, sorted_by
+
+    def sort(self, ids, sorted_by, column, descending=False):
+        if column == sorted_by:
+            ordered = ids
+        elif sorted_by is None and len(ids) == self.size:
+            ordered = self.order[column]
+        else:
+            ordered = ids[np.argsort(self.values[column][ids], kind='stable')]
+        if descending:
+            # Keep missing values last in both directions.
+            values = self.values[column][ordered]
+            present = ordered[~np.isnan(values)]
+            ordered = np.concatenate([present[::-1], ordered[np.isnan(values)]])
+        return ordered
+
+    def stats(self, ids=None):
+        if ids is None:
+            ids = slice(None)
+        codes = self.type_codes[ids]
+        stats = {'total_equipment': int(len(codes))}
+        for column in NUMERIC_COLUMNS:
+            values = self.values[column][ids]
+            values = values[~np.isnan(values)]
+            stats[f'average_{column.lower()}'] = float(values.mean(dtype=np.float64)) if len(values) else 0.0
+
+        counts = np.bincount(codes[codes >= 0], minlength=len(self.type_names))
+        order = np.argsort(-counts, kind='stable')
+        stats['equipment_distribution'] = {
+            self.type_names[code]: int(counts[code]) for code in order if counts[code]
+        }
+        return stats
+
+    def rows(self, ids):
+        return self.dataset.rows(ids)
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+def get_dataset_index(key, load_dataset, warm=False):
+    # ``key`` must change whenever the dataset does (e.g. on append).
+    with _cache_lock:
+        index = _cache.get(key)
+        if index is not None:
+            _cache.move_to_end(key)
+            return index
+
+    index = DatasetIndex(load_dataset())
+    if warm:
+        index.warm()
+    with _cache_lock:
+        _cache[key] = index
+        while len(_cache) > INDEX_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return index
+
+def cached_dataset_index(key):
+    # The index for ``key`` if one is cached; never builds it.
+    with _cache_lock:
+        return _cache.get(key)
+
+def discard_dataset_indexes(upload_id):
+    # Drops every cached version of an upload, e.g. the pre-append one, so
+    # frequent appends do not crowd other uploads out of the cache.
+    with _cache_lock:
+        for key in [key for key in _cache if key[0] == upload_id]:
+            del _cache[key]
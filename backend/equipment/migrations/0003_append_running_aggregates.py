@@ -0,0 +1,92 @@
+# Generated by Django 5.2.10 on 2026-10-19 09:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("equipment", "0002_add_summary_fields"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="equipmentupload",
+            name="append_count",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="equipmentupload",
+            name="equipment_distribution",
+            field=models.JSONField(default=dict),
+        ),
+        migrations.AddField(
+            model_name="equipmentupload",
+            name="flowrate_count",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="equipmentupload",
+            name="flowrate_sum",
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.AddField(
+            model_name="equipmentupload",
+            name="pressure_count",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="equipmentupload",
+            name="pressure_sum",
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.AddField(
+            model_name="equipmentupload",
+            name="temperature_count",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="equipmentupload",
+            name="temperature_sum",
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.CreateModel(
+            name="EquipmentRecord",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=255)),
+                (
+                    "equipment_type",
+                    models.CharField(blank=True, max_length=255, null=True),
+                ),
+                ("flowrate", models.FloatField(blank=True, null=True)),
+                ("pressure", models.FloatField(blank=True, null=True)),
+                ("temperature", models.FloatField(blank=True, null=True)),
+                (
+                    "upload",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="records",
+                        to="equipment.equipmentupload",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["id"],
+                "indexes": [
+                    models.Index(
+                        fields=["upload", "name"], name="equipment_e_upload__717e35_idx"
+                    )
+                ],
+            },
+        ),
+    ]
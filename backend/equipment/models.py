@@ -1,6 +1,7 @@
-from django.db import models
-from django.db.models.signals import post_save
+from django.db import models, transaction
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
+from .events import broker
 
 class EquipmentUpload(models.Model):
     uploaded_at = models.DateTimeField(auto_now_add=True)
@@ -9,6 +10,15 @@ class EquipmentUpload(models.Model):
     average_flowrate = models.FloatField(default=0.0)
     average_pressure = models.FloatField(default=0.0)
     average_temperature = models.FloatField(default=0.0)
+    # Running sums and non-null counts so appends can update averages in place.
+    flowrate_sum = models.FloatField(default=0.0)
+    flowrate_count = models.IntegerField(default=0)
+    pressure_sum = models.FloatField(default=0.0)
+    pressure_count = models.IntegerField(default=0)
+    temperature_sum = models.FloatField(default=0.0)
+    temperature_count = models.IntegerField(default=0)
+    equipment_distribution = models.JSONField(default=dict)
+    append_count = models.IntegerField(default=0)
     
     class Meta:
         ordering = ['-uploaded_at']
@@ -16,14 +26,65 @@ class EquipmentUpload(models.Model):
     def __str__(self):
         return f"Upload {self.id} at {self.uploaded_at}"
 
+class EquipmentRecord(models.Model):
+    # Per-row storage, materialised on the first append so later appends can
+    # upsert by Equipment Name without re-reading the original CSV.
+    upload = models.ForeignKey(EquipmentUpload, on_delete=models.CASCADE, related_name='records')
+    name = models.CharField(max_length=255)
+    equipment_type = models.CharField(max_length=255, null=True, blank=True)
+    flowrate = models.FloatField(null=True, blank=True)
+    pressure = models.FloatField(null=True, blank=True)
+    temperature = models.FloatField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['id']
+        indexes = [models.Index(fields=['upload', 'name'])]
+    
+    def __str__(self):
+        return f"{self.name} ({self.upload_id})"
+
+def apply_retention():
+    uploads = EquipmentUpload.objects.order_by('uploaded_at')
+    extra_count = uploads.count() - 5
+    if extra_count > 0:
+        # Delete oldest uploads beyond the last 5, including CSV files.
+        for old_upload in uploads[:extra_count]:
+            if old_upload.csv_file:
+                old_upload.csv_file.delete(save=False)
+            old_upload.delete()
+
 @receiver(post_save, sender=EquipmentUpload)
 def delete_old_uploads(sender, instance, created, **kwargs):
     if created:
-        uploads = EquipmentUpload.objects.order_by('uploaded_at')
-        extra_count = uploads.count() - 5
-        if extra_count > 0:
-            # Delete oldest uploads beyond the last 5, including CSV files.
-            for old_upload in uploads[:extra_count]:
-                if old_upload.csv_file:
-                    old_upload.csv_file.delete()
-                old_upload.delete()
+        apply_retention()
+
+def upload_event_payload(upload):
+    return {
+        'id': upload.id,
+        'uploaded_at': upload.uploaded_at,
+        'total_equipment': upload.total_equipment,
+        'average_flowrate': upload.average_flowrate,
+        'average_pressure': upload.average_pressure,
+        'average_temperature': upload.average_temperature,
+    }
+
+@receiver(post_save, sender=EquipmentUpload)
+def broadcast_upload_saved(sender, instance, created, **kwargs):
+    # Appends re-save an existing upload; subscribers see that as an update.
+    event_type = 'upload.created' if created else 'upload.updated'
+    payload = upload_event_payload(instance)
+    transaction.on_commit(lambda: broker.publish(event_type, payload))
+
+def broadcast_uploads_created(uploads):
+    # bulk_create sends no post_save, so batch inserts announce themselves.
+    payloads = [upload_event_payload(upload) for upload in uploads]
+    
+    def publish():
+        for payload in payloads:
+            broker.publish('upload.created', payload)
+    transaction.on_commit(publish)
+
+@receiver(post_delete, sender=EquipmentUpload)
+def broadcast_upload_deleted(sender, instance, **kwargs):
+    payload = {'id': instance.id}
+    transaction.on_commit(lambda: broker.publish('upload.deleted', payload))
@@ -0,0 +1,64 @@
+import io
+from reportlab.lib.pagesizes import letter
+from reportlab.lib import colors
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+from reportlab.lib.units import inch
+
+def build_summary_pdf(stats):
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=letter)
+    elements = []
+    styles = getSampleStyleSheet()
+    
+    title = Paragraph("Chemical Equipment Summary Report", styles['Title'])
+    elements.append(title)
+    elements.append(Spacer(1, 0.3 * inch))
+    
+    summary_data = [
+        ['Metric', 'Value'],
+        ['Total Equipment', str(stats['total_equipment'])],
+        ['Average Flowrate', f"{stats['average_flowrate']:.2f}"],
+        ['Average Pressure', f"{stats['average_pressure']:.2f}"],
+        ['Average Temperature', f"{stats['average_temperature']:.2f}"]
+    ]
+    
+    summary_table = Table(summary_data, colWidths=[3*inch, 2*inch])
+    summary_table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 12),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black)
+    ]))
+    
+    elements.append(summary_table)
+    elements.append(Spacer(1, 0.3 * inch))
+    
+    subtitle = Paragraph("Equipment Type Distribution", styles['Heading2'])
+    elements.append(subtitle)
+    elements.append(Spacer(1, 0.2 * inch))
+    
+    dist_data = [['Equipment Type', 'Count']]
+    for eq_type, count in stats['equipment_distribution'].items():
+        dist_data.append([str(eq_type), str(count)])
+    
+    dist_table = Table(dist_data, colWidths=[3*inch, 2*inch])
+    dist_table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 12),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.lightblue),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black)
+    ]))
+    
+    elements.append(dist_table)
+    
+    doc.build(elements)
+    return buffer.getvalue()
@@ -0,0 +1,266 @@
+import numpy as np
+
+NGRAM_SIZE = 3
+# Once this few candidates remain, checking the substring directly is cheaper
+# than probing further posting lists.
+VERIFY_THRESHOLD = 64
+VERIFY_CHUNK = 512
+# Posting lists of comparable length are intersected through a mask over all
+# names; past this many such passes the rest only filter the requested page.
+DENSE_PASSES = 1
+# Postings are sorted as one packed (n-gram, name) int64 key when that fits;
+# larger alphabets fall back to a two-key sort.
+PACKED_KEY_MAX = np.iinfo(np.int64).max
+
+def _sorted_contains(values, items):
+    # Whether each of ``items`` is in the sorted array ``values``.
+    positions = np.minimum(np.searchsorted(values, items), len(values) - 1)
+    return values[positions] == items
+
+class NameSearchIndex:
+    # Case-insensitive Equipment Name lookup over the distinct names of a
+    # dataset's StringTable: the names' alphabetical order (as codes) for
+    # prefix search and n-gram postings for substring search. Only the
+    # requested page of substring matches is verified.
+    def __init__(self, names, name_codes):
+        self.lowered = names.lower()
+        self.size = len(self.lowered)
+        lowered_list = self.lowered.tolist()
+        self.sorted_codes = np.array(
+            sorted(range(self.size), key=lowered_list.__getitem__), dtype=np.int32
+        )
+        del lowered_list
+        self.rank = np.empty(self.size, dtype=np.int32)
+        self.rank[self.sorted_codes] = np.arange(self.size, dtype=np.int32)
+
+        # Rows per distinct name; None when every row has its own name.
+        if len(name_codes) == self.size and np.array_equal(name_codes, np.arange(self.size)):
+            self.code_rows = None
+            self.row_counts = None
+        else:
+            order = np.argsort(name_codes, kind='stable').astype(np.int32)
+            bounds = np.searchsorted(name_codes[order], np.arange(self.size + 1))
+            self.code_rows = order
+            self.code_bounds = bounds
+            self.row_counts = np.diff(bounds)
+        self._build_postings()
+
+    def _build_postings(self):
+        # One UCS-4 code point per character of the concatenated names,
+        # renumbered into the (small) alphabet actually used so that an
+        # n-gram and the code of its name pack into a single int64 key.
+        chars = np.frombuffer(self.lowered.text.encode('utf-32-le'), dtype=np.uint32)
+        present = np.zeros(0x110000, dtype=bool)
+        present[chars] = True
+        self.alphabet = np.flatnonzero(present).astype(np.uint32)
+        del present
+        # Every name is padded with NGRAM_SIZE - 1 end markers (one past the
+        # alphabet), so each character starts an n-gram and any query up to
+        # NGRAM_SIZE long is the prefix of the n-grams that contain it.
+        end = len(self.alphabet)
+        self.base = base = end + 1
+        pad = NGRAM_SIZE - 1
+        owners = np.repeat(np.arange(self.size, dtype=np.int32), np.diff(self.lowered.offsets))
+        starts = np.arange(len(chars), dtype=np.int64) + pad * owners
+        symbols = np.full(len(chars) + pad * self.size, end, dtype=np.int64)
+        symbols[starts] = np.searchsorted(self.alphabet, chars)
+        del chars
+
+        grams = symbols[starts]
+        for shift in range(1, NGRAM_SIZE):
+            grams *= base
+            grams += symbols[starts + shift]
+        # Postings hold each name's alphabetical position rather than its
+        # code, so intersecting them yields matches already in page order.
+        rows = self.rank[owners]
+        del symbols, starts, owners
+
+        if base ** NGRAM_SIZE * max(self.size, 1) <= PACKED_KEY_MAX:
+            keys = grams * self.size + rows
+            del grams, rows
+            # Sorting the packed keys orders the n-grams and, within each,
+            # their names; equal keys are a name repeating an n-gram.
+            keys.sort()
+            keys = keys[np.r_[True, keys[1:] != keys[:-1]]] if len(keys) else keys
+            grams, rows = np.divmod(keys, max(self.size, 1))
+            del keys
+        else:
+            order = np.lexsort((rows, grams))
+            grams, rows = grams[order], rows[order]
+            # A name repeating an n-gram should only be listed once.
+            keep = np.ones(len(grams), dtype=bool)
+            keep[1:] = (grams[1:] != grams[:-1]) | (rows[1:] != rows[:-1])
+            grams, rows = grams[keep], rows[keep]
+
+        starts = np.flatnonzero(np.r_[True, grams[1:] != grams[:-1]]) if len(grams) else np.empty(0, dtype=np.intp)
+        self.gram_keys = grams[starts]
+        self.posting_bounds = np.r_[starts, len(grams)]
+        self.posting_rows = rows.astype(np.int32)
+
+    def _postings(self, fragment):
+        # Alphabetical positions of the names holding every n-gram that
+        # starts with ``fragment`` (at most NGRAM_SIZE characters), or None
+        # if no name contains it. A full n-gram has one sorted list; a
+        # shorter fragment spans several, possibly repeating names.
+        chars = np.array([fragment]).view(np.uint32)
+        symbols = np.searchsorted(self.alphabet, chars)
+        if symbols.max() == len(self.alphabet) or (self.alphabet[symbols] != chars).any():
+            return None
+        key = 0
+        for symbol in symbols.tolist():
+            key = key * self.base + symbol
+        span = self.base ** (NGRAM_SIZE - len(fragment))
+        low, high = np.searchsorted(self.gram_keys, [key * span, (key + 1) * span])
+        if low == high:
+            return None
+        return self.posting_rows[self.posting_bounds[low]:self.posting_bounds[high]]
+
+    def _bisect(self, value):
+        # First position in alphabetical order whose name is >= value.
+        lowered, codes = self.lowered, self.sorted_codes
+        low, high = 0, self.size
+        while low < high:
+            middle = (low + high) // 2
+            if lowered[codes[middle]] < value:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def prefix_range(self, query):
+        upper = query[:-1] + chr(ord(query[-1]) + 1)
+        return self._bisect(query), self._bisect(upper)
+
+    def _posting_lists(self, query):
+        # Posting lists whose intersection holds every name containing the
+        # query, smallest first, or None if no name can. A query of up to
+        # NGRAM_SIZE characters has a single list of exactly its matches,
+        # repeating names when it is shorter than an n-gram.
+        if len(query) <= NGRAM_SIZE:
+            rows = self._postings(query)
+            return None if rows is None else [rows]
+        postings = []
+        for start in range(len(query) - NGRAM_SIZE + 1):
+            rows = self._postings(query[start:start + NGRAM_SIZE])
+            if rows is None:
+                return None
+            postings.append(rows)
+        postings.sort(key=len)
+        return postings
+
+    def _candidate_ranks(self, query, postings):
+        # (ranks, pending, complete): the sorted alphabetical positions of
+        # every name that may contain the query, posting lists left to
+        # filter them by page, and whether each of them certainly does.
+        if len(query) < NGRAM_SIZE:
+            return self._unique(postings[0]), [], True
+        candidates, pending, passes = postings[0], [], 0
+        for rows in postings[1:]:
+            if len(candidates) <= VERIFY_THRESHOLD:
+                break
+            if len(candidates) * 16 < len(rows):
+                candidates = candidates[_sorted_contains(rows, candidates)]
+            elif passes < DENSE_PASSES:
+                # Comparable lengths: marking one list beats binary search.
+                present = np.zeros(self.size, dtype=bool)
+                present[rows] = True
+                candidates = candidates[present[candidates]]
+                passes += 1
+            else:
+                pending.append(rows)
+        return candidates, pending, len(query) == NGRAM_SIZE
+
+    def _page_candidates(self, ranks, pending, skip):
+        # Candidates outside the ``skip`` range of alphabetical positions,
+        # as chunks of codes in page order, plus how many rows they cover.
+        low, high = np.searchsorted(ranks, skip)
+        outside = np.r_[ranks[:low], ranks[high:]]
+
+        def chunks():
+            for chunk_start in range(0, len(outside), VERIFY_CHUNK):
+                chunk = outside[chunk_start:chunk_start + VERIFY_CHUNK]
+                for rows in pending:
+                    chunk = chunk[_sorted_contains(rows, chunk)]
+                yield self.sorted_codes[chunk]
+        rows = len(outside) if self.row_counts is None else self._count_rows(self.sorted_codes[outside])
+        return chunks(), rows
+
+    def _unique(self, values):
+        # Sorted distinct values of an int array bounded by the name count.
+        if len(values) * 16 < self.size:
+            values = np.sort(values)
+            return values[np.r_[True, values[1:] != values[:-1]]] if len(values) else values
+        present = np.zeros(self.size, dtype=bool)
+        present[values] = True
+        return np.flatnonzero(present).astype(values.dtype)
+
+    def _count_rows(self, codes):
+        return len(codes) if self.row_counts is None else int(self.row_counts[codes].sum())
+
+    def _rows(self, codes):
+        if self.code_rows is None:
+            return np.asarray(codes, dtype=np.intp)
+        if not len(codes):
+            return np.empty(0, dtype=np.intp)
+        return np.concatenate([
+            self.code_rows[self.code_bounds[code]:self.code_bounds[code + 1]] for code in codes
+        ]).astype(np.intp)
+
+    def _substring_codes(self, query, chunks, verify, target):
+        # Codes from ``chunks`` whose names contain the query, taken until
+        # they cover ``target`` rows. Also returns whether every candidate
+        # was taken.
+        found, rows = [], 0
+        lowered = self.lowered
+        for chunk in chunks:
+            for code in chunk.tolist():
+                if verify and query not in lowered[code]:
+                    continue
+                found.append(code)
+                rows += 1 if self.row_counts is None else int(self.row_counts[code])
+                if rows >= target:
+                    return found, rows, False
+        return found, rows, True
+
+    def search(self, query, limit, offset=0):
+        # Returns (row ids for the page, match count, whether that count is
+        # exact). Ranked as: exact match, prefix matches, then names merely
+        # containing the query; both groups alphabetical. Only as many
+        # substring matches as the page needs are verified; past that the
+        # count comes from the posting lists and is an estimate.
+        query = query.strip().lower()
+        if not query:
+            return np.empty(0, dtype=np.intp), 0, True
+
+        start, stop = self.prefix_range(query)
+        prefix = self.sorted_codes[start:stop]
+        prefix_rows = self._count_rows(prefix)
+        wanted = offset + limit
+
+        inner = []
+        postings = self._posting_lists(query)
+        if postings is None:
+            count, exact = prefix_rows, True
+        elif wanted <= prefix_rows:
+            # The page is all prefix matches; the smallest posting list
+            # bounds how many names contain the query at all.
+            count, exact = max(prefix_rows, len(postings[0])), False
+        else:
+            ranks, pending, complete = self._candidate_ranks(query, postings)
+            chunks, candidate_rows = self._page_candidates(ranks, pending, (start, stop))
+            inner, inner_rows, exhausted = self._substring_codes(
+                query, chunks, not complete, wanted - prefix_rows
+            )
+            exact = complete or exhausted
+            count = prefix_rows + (inner_rows if exhausted else max(inner_rows, candidate_rows))
+        ranked = np.r_[prefix, np.asarray(inner, dtype=np.int32)].astype(np.int32)
+
+        if self.row_counts is None:
+            ids = ranked[offset:wanted].astype(np.intp)
+        else:
+            cumulative = np.cumsum(self.row_counts[ranked])
+            first = int(np.searchsorted(cumulative, offset, side='right'))
+            last = int(np.searchsorted(cumulative, wanted, side='left')) + 1
+            skipped = int(cumulative[first - 1]) if first else 0
+            ids = self._rows(ranked[first:last])[offset - skipped:wanted - skipped]
+        return ids, count, exact
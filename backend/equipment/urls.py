@@ -3,7 +3,13 @@ from . import views
 
 urlpatterns = [
     path('upload/', views.upload_csv, name='upload_csv'),
+    path('upload/batch/', views.upload_batch, name='upload_batch'),
     path('latest/', views.get_latest, name='get_latest'),
     path('history/', views.get_history, name='get_history'),
+    path('fleet/', views.get_fleet_stats, name='get_fleet_stats'),
+    path('events/', views.upload_events, name='upload_events'),
     path('pdf/', views.generate_pdf, name='generate_pdf'),
+    path('uploads/<int:upload_id>/query/', views.query_upload, name='query_upload'),
+    path('uploads/<int:upload_id>/search/', views.search_upload, name='search_upload'),
+    path('uploads/<int:upload_id>/export/<str:export_format>/', views.export_upload, name='export_upload'),
 ]
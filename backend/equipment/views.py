@@ -1,42 +1,231 @@
-import pandas as pd
-import io
-from django.http import HttpResponse
+from django.core.files.base import ContentFile
+from django.core.handlers.asgi import ASGIRequest
+from django.db import transaction
+from django.http import HttpResponse, StreamingHttpResponse
 from rest_framework import status
 from rest_framework.decorators import api_view, parser_classes
 from rest_framework.parsers import MultiPartParser, FormParser
 from rest_framework.response import Response
-from reportlab.lib.pagesizes import letter
-from reportlab.lib import colors
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from reportlab.lib.units import inch
-from .models import EquipmentUpload
+from .batch import expand_batch_files, parse_batch
+from .events import async_event_stream, event_stream
+from .exports import iter_csv, iter_gzip, iter_xlsx
+from .fleet import WEIGHTINGS, merge_partials, needs_backfill, upload_partial
+from .models import EquipmentUpload, EquipmentRecord, apply_retention, broadcast_uploads_created
 from .serializers import EquipmentUploadSerializer
 
+# pandas, NumPy and ReportLab are imported inside the functions that use them
+# so a worker only pays for them once it serves a request that needs them;
+# see equipment/warmup.py for loading them ahead of forking instead.
 REQUIRED_COLUMNS = ['Equipment Name', 'Type', 'Flowrate', 'Pressure', 'Temperature']
+# Numeric CSV columns and the model field prefix holding their running sum/count.
+AGGREGATE_FIELDS = {
+    'Flowrate': 'flowrate',
+    'Pressure': 'pressure',
+    'Temperature': 'temperature',
+}
+NUMERIC_COLUMNS = list(AGGREGATE_FIELDS)
+# Keep IN (...) lookups below SQLite's bound-parameter limit.
+LOOKUP_BATCH_SIZE = 500
+DEFAULT_QUERY_LIMIT = 100
+MAX_QUERY_LIMIT = 1000
+DEFAULT_SEARCH_LIMIT = 20
 
-def parse_csv_and_calculate_stats(csv_file):
+def read_equipment_csv(csv_file):
+    import pandas as pd
+    
     try:
         df = pd.read_csv(csv_file)
+    except Exception as e:
+        return None, str(e)
+    
+    missing_columns = [col for col in REQUIRED_COLUMNS if col not in df.columns]
+    if missing_columns:
+        return None, f"Missing required columns: {', '.join(missing_columns)}"
+    
+    return df, None
+
+def calculate_aggregates(df):
+    import pandas as pd
+    
+    aggregates = {
+        'total_equipment': len(df),
+        'equipment_distribution': {
+            str(eq_type): int(count)
+            for eq_type, count in df['Type'].value_counts().items()
+        },
+    }
+    for column, field in AGGREGATE_FIELDS.items():
+        values = pd.to_numeric(df[column])
+        aggregates[f'{field}_sum'] = float(values.sum())
+        aggregates[f'{field}_count'] = int(values.count())
+    return aggregates
+
+def stats_from_upload(upload):
+    return {
+        'total_equipment': upload.total_equipment,
+        'average_flowrate': upload.average_flowrate,
+        'average_pressure': upload.average_pressure,
+        'average_temperature': upload.average_temperature,
+        # Largest type first, as DatasetIndex.stats orders it.
+        'equipment_distribution': dict(
+            sorted(upload.equipment_distribution.items(), key=lambda item: -item[1])
+        ),
+    }
+
+def summarize_frame(df):
+    stats = {
+        'total_equipment': len(df),
+        'average_flowrate': float(df['Flowrate'].mean()),
+        'average_pressure': float(df['Pressure'].mean()),
+        'average_temperature': float(df['Temperature'].mean()),
+        'equipment_distribution': df['Type'].value_counts().to_dict()
+    }
+    return stats, calculate_aggregates(df)
+
+def parse_csv_and_calculate_stats(csv_file):
+    df, error = read_equipment_csv(csv_file)
+    if error:
+        return None, error
+    
+    try:
+        stats, aggregates = summarize_frame(df)
         
-        missing_columns = [col for col in REQUIRED_COLUMNS if col not in df.columns]
-        if missing_columns:
-            return None, f"Missing required columns: {', '.join(missing_columns)}"
-        
-        stats = {
-            'total_equipment': len(df),
-            'average_flowrate': float(df['Flowrate'].mean()),
-            'average_pressure': float(df['Pressure'].mean()),
-            'average_temperature': float(df['Temperature'].mean()),
-            'equipment_distribution': df['Type'].value_counts().to_dict()
-        }
-        
-        data = df.to_dict('records')
+        from .dataset import EquipmentDataset
+        dataset = EquipmentDataset(df)
         
-        return {'stats': stats, 'data': data}, None
+        return {'stats': stats, 'aggregates': aggregates, 'dataset': dataset}, None
     except Exception as e:
         return None, str(e)
 
+def load_upload_frame(upload):
+    # Appended datasets live in EquipmentRecord rows; untouched uploads are
+    # still served straight from their CSV.
+    if not upload.append_count:
+        return read_equipment_csv(upload.csv_file)
+    
+    import pandas as pd
+    
+    rows = upload.records.values_list('name', 'equipment_type', 'flowrate', 'pressure', 'temperature')
+    return pd.DataFrame.from_records(list(rows), columns=REQUIRED_COLUMNS), None
+
+def load_upload_stats(upload):
+    try:
+        index = load_upload_index(upload)
+    except ValueError as e:
+        return None, None, str(e)
+    # Appended uploads keep exact running totals; CSV-backed ones are
+    # summarised from the cached dataset.
+    stats = stats_from_upload(upload) if upload.append_count else index.stats()
+    return index, stats, None
+
+def load_upload_data(upload):
+    index, stats, error = load_upload_stats(upload)
+    if error:
+        return None, error
+    return {'stats': stats, 'data': index.dataset.rows()}, None
+
+def _frame_to_records(upload, df):
+    from .dataset import optional_value
+
+    return [
+        EquipmentRecord(
+            upload=upload,
+            name=str(name),
+            equipment_type=None if optional_value(eq_type) is None else str(eq_type),
+            flowrate=optional_value(flowrate),
+            pressure=optional_value(pressure),
+            temperature=optional_value(temperature),
+        )
+        for name, eq_type, flowrate, pressure, temperature in df[REQUIRED_COLUMNS].itertuples(index=False)
+    ]
+
+def _coerce_numeric(df):
+    import pandas as pd
+    
+    df = df.copy()
+    for column in AGGREGATE_FIELDS:
+        df[column] = pd.to_numeric(df[column])
+    return df
+
+def _refresh_averages(upload):
+    for field in AGGREGATE_FIELDS.values():
+        count = getattr(upload, f'{field}_count')
+        total = getattr(upload, f'{field}_sum')
+        setattr(upload, f'average_{field}', total / count if count else 0.0)
+
+def _apply_record(upload, record, sign):
+    upload.total_equipment += sign
+    for field in AGGREGATE_FIELDS.values():
+        value = getattr(record, field)
+        if value is not None:
+            setattr(upload, f'{field}_sum', getattr(upload, f'{field}_sum') + sign * value)
+            setattr(upload, f'{field}_count', getattr(upload, f'{field}_count') + sign)
+    if record.equipment_type is not None:
+        distribution = upload.equipment_distribution
+        count = distribution.get(record.equipment_type, 0) + sign
+        if count:
+            distribution[record.equipment_type] = count
+        else:
+            distribution.pop(record.equipment_type, None)
+
+def _check_append_frame(df):
+    # EquipmentRecord only stores the required columns; refuse rather than
+    # silently drop anything else.
+    extra_columns = [str(col) for col in df.columns if col not in REQUIRED_COLUMNS]
+    if extra_columns:
+        raise ValueError(f"Append does not support extra columns: {', '.join(extra_columns)}")
+    # Records are keyed by name, so a blank one cannot be stored or upserted.
+    names = df['Equipment Name']
+    missing = names.isna() | (names.astype(str).str.strip() == '')
+    if missing.any():
+        row = int(missing.to_numpy().argmax()) + 1
+        raise ValueError(f'Equipment Name is missing in row {row}')
+
+def _materialize_records(upload):
+    # One-off copy of the original CSV into EquipmentRecord rows; this also
+    # backfills running sums for uploads created before they were stored.
+    df, error = read_equipment_csv(upload.csv_file)
+    if error:
+        raise ValueError(error)
+    _check_append_frame(df)
+    df = _coerce_numeric(df)
+    EquipmentRecord.objects.bulk_create(_frame_to_records(upload, df), batch_size=1000)
+    for field, value in calculate_aggregates(df).items():
+        setattr(upload, field, value)
+
+def append_rows(upload, df):
+    # Upsert by Equipment Name, adjusting stored aggregates by the delta only.
+    _check_append_frame(df)
+    df = _coerce_numeric(df).drop_duplicates('Equipment Name', keep='last')
+    new_records = _frame_to_records(upload, df)
+    names = [record.name for record in new_records]
+    
+    with transaction.atomic():
+        upload = EquipmentUpload.objects.select_for_update().get(pk=upload.pk)
+        if not upload.append_count:
+            _materialize_records(upload)
+        
+        updated = 0
+        for start in range(0, len(names), LOOKUP_BATCH_SIZE):
+            existing = list(EquipmentRecord.objects.filter(
+                upload=upload, name__in=names[start:start + LOOKUP_BATCH_SIZE]
+            ))
+            for record in existing:
+                _apply_record(upload, record, -1)
+            updated += len({record.name for record in existing})
+            EquipmentRecord.objects.filter(pk__in=[record.pk for record in existing]).delete()
+        
+        for record in new_records:
+            record.upload = upload
+            _apply_record(upload, record, 1)
+        EquipmentRecord.objects.bulk_create(new_records, batch_size=1000)
+        
+        upload.append_count += 1
+        _refresh_averages(upload)
+        upload.save()
+    
+    return upload, len(new_records) - updated, updated
+
 @api_view(['POST'])
 @parser_classes([MultiPartParser, FormParser])
 def upload_csv(request):
@@ -54,6 +243,9 @@ def upload_csv(request):
             status=status.HTTP_400_BAD_REQUEST
         )
     
+    if request.data.get('mode') == 'append':
+        return append_csv(request, csv_file)
+    
     result, error = parse_csv_and_calculate_stats(csv_file)
     
     if error:
@@ -67,19 +259,140 @@ def upload_csv(request):
     # Store summary stats with the upload for history display.
     upload = EquipmentUpload.objects.create(
         csv_file=csv_file,
-        total_equipment=stats['total_equipment'],
         average_flowrate=stats['average_flowrate'],
         average_pressure=stats['average_pressure'],
         average_temperature=stats['average_temperature'],
+        **result['aggregates'],
     )
+    # Build the query and search indexes while the parsed dataset is at hand.
+    load_upload_index(upload, dataset=result['dataset'], warm=True)
     
     return Response({
         'id': upload.id,
         'uploaded_at': upload.uploaded_at,
         'stats': result['stats'],
-        'data': result['data']
+        'data': result['dataset'].rows()
     }, status=status.HTTP_201_CREATED)
 
+@api_view(['POST'])
+@parser_classes([MultiPartParser, FormParser])
+def upload_batch(request):
+    uploaded_files = request.FILES.getlist('files')
+    if not uploaded_files:
+        return Response(
+            {'error': 'No files provided'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    try:
+        entries = expand_batch_files(uploaded_files)
+    except ValueError as e:
+        return Response(
+            {'error': str(e)},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    pending = [entry for entry in entries if 'error' not in entry]
+    try:
+        parsed = parse_batch(pending)
+    except Exception as e:
+        return Response(
+            {'error': str(e)},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+    
+    uploads = []
+    for entry, result in zip(pending, parsed):
+        if 'error' in result:
+            entry['error'] = result['error']
+            continue
+        stats = result['stats']
+        entry['stats'] = stats
+        entry['upload'] = EquipmentUpload(
+            csv_file=ContentFile(entry.pop('data'), name=entry['name']),
+            average_flowrate=stats['average_flowrate'],
+            average_pressure=stats['average_pressure'],
+            average_temperature=stats['average_temperature'],
+            **result['aggregates'],
+        )
+        uploads.append(entry['upload'])
+    
+    with transaction.atomic():
+        EquipmentUpload.objects.bulk_create(uploads)
+    # bulk_create bypasses post_save, so retention runs once for the batch and
+    # only the uploads it keeps are announced.
+    apply_retention()
+    retained = set(
+        EquipmentUpload.objects.filter(pk__in=[upload.pk for upload in uploads]).values_list('pk', flat=True)
+    )
+    broadcast_uploads_created([upload for upload in uploads if upload.pk in retained])
+    
+    results = []
+    for entry in entries:
+        if 'error' in entry:
+            results.append({'file': entry['file'], 'error': entry['error']})
+            continue
+        upload = entry['upload']
+        results.append({
+            'file': entry['file'],
+            'id': upload.id,
+            'uploaded_at': upload.uploaded_at,
+            'retained': upload.id in retained,
+            'stats': entry['stats'],
+        })
+    
+    return Response({
+        'created': len(uploads),
+        'failed': len(entries) - len(uploads),
+        'results': results,
+    }, status=status.HTTP_201_CREATED if uploads else status.HTTP_400_BAD_REQUEST)
+
+def append_csv(request, csv_file):
+    upload_id = request.data.get('upload_id')
+    if upload_id:
+        try:
+            upload_id = int(upload_id)
+        except ValueError:
+            return Response(
+                {'error': 'upload_id must be an integer'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        upload = EquipmentUpload.objects.filter(pk=upload_id).first()
+    else:
+        upload = EquipmentUpload.objects.first()
+    
+    if not upload:
+        return Response(
+            {'error': 'Upload not found'},
+            status=status.HTTP_404_NOT_FOUND
+        )
+    
+    df, error = read_equipment_csv(csv_file)
+    if error:
+        return Response(
+            {'error': error},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    try:
+        upload, appended, updated = append_rows(upload, df)
+    except (ValueError, TypeError) as e:
+        return Response(
+            {'error': str(e)},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    from .indexes import discard_dataset_indexes
+    discard_dataset_indexes(upload.id)
+    
+    return Response({
+        'id': upload.id,
+        'uploaded_at': upload.uploaded_at,
+        'appended': appended,
+        'updated': updated,
+        'stats': stats_from_upload(upload),
+    })
+
 @api_view(['GET'])
 def get_latest(request):
     try:
@@ -91,7 +404,7 @@ def get_latest(request):
                 status=status.HTTP_404_NOT_FOUND
             )
         
-        result, error = parse_csv_and_calculate_stats(latest_upload.csv_file)
+        result, error = load_upload_data(latest_upload)
         
         if error:
             return Response(
@@ -111,6 +424,235 @@ def get_latest(request):
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
 
+def load_upload_dataset(upload):
+    from .dataset import EquipmentDataset
+    
+    df, error = load_upload_frame(upload)
+    if error:
+        raise ValueError(error)
+    return EquipmentDataset(df)
+
+def load_upload_index(upload, dataset=None, warm=False):
+    from .indexes import get_dataset_index
+    
+    def load_dataset():
+        return dataset if dataset is not None else load_upload_dataset(upload)
+    
+    return get_dataset_index((upload.id, upload.append_count), load_dataset, warm=warm)
+
+def _parse_float(params, name):
+    value = params.get(name)
+    if value in (None, ''):
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        raise ValueError(f"Invalid number for {name}: {value}")
+
+def _parse_page(params, default_limit, max_limit):
+    try:
+        limit = int(params.get('limit', default_limit))
+        offset = int(params.get('offset', 0))
+    except ValueError:
+        raise ValueError('limit and offset must be integers')
+    if limit < 0 or offset < 0:
+        raise ValueError('limit and offset must not be negative')
+    return min(limit, max_limit), offset
+
+def parse_query_params(params):
+    types = [value for item in params.getlist('type') for value in item.split(',') if value]
+    ranges = {
+        column: (
+            _parse_float(params, f'{column.lower()}_min'),
+            _parse_float(params, f'{column.lower()}_max'),
+        )
+        for column in NUMERIC_COLUMNS
+    }
+    
+    sort = params.get('sort') or None
+    descending = False
+    if sort:
+        descending = sort.startswith('-')
+        sort = sort.lstrip('-').capitalize()
+        if sort not in NUMERIC_COLUMNS:
+            raise ValueError(f"Cannot sort by {params.get('sort')}")
+    
+    limit, offset = _parse_page(params, DEFAULT_QUERY_LIMIT, MAX_QUERY_LIMIT)
+    
+    return {
+        'types': types or None,
+        'ranges': ranges,
+        'sort': sort,
+        'descending': descending,
+        'limit': limit,
+        'offset': offset,
+    }
+
+def run_query(index, query):
+    ids, sorted_by = index.select(query['types'], query['ranges'])
+    if query['sort']:
+        ids = index.sort(ids, sorted_by, query['sort'], query['descending'])
+    return ids
+
+@api_view(['GET'])
+def query_upload(request, upload_id):
+    upload = EquipmentUpload.objects.filter(pk=upload_id).first()
+    if not upload:
+        return Response(
+            {'error': 'Upload not found'},
+            status=status.HTTP_404_NOT_FOUND
+        )
+    
+    try:
+        query = parse_query_params(request.query_params)
+    except ValueError as e:
+        return Response(
+            {'error': str(e)},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    try:
+        index = load_upload_index(upload)
+    except Exception as e:
+        return Response(
+            {'error': str(e)},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+    
+    ids = run_query(index, query)
+    page = ids[query['offset']:query['offset'] + query['limit']]
+    
+    return Response({
+        'id': upload.id,
+        'uploaded_at': upload.uploaded_at,
+        'count': int(len(ids)),
+        'stats': index.stats(ids),
+        'data': index.rows(page),
+    })
+
+@api_view(['GET'])
+def search_upload(request, upload_id):
+    upload = EquipmentUpload.objects.filter(pk=upload_id).first()
+    if not upload:
+        return Response(
+            {'error': 'Upload not found'},
+            status=status.HTTP_404_NOT_FOUND
+        )
+    
+    query = request.query_params.get('q', '')
+    try:
+        limit, offset = _parse_page(request.query_params, DEFAULT_SEARCH_LIMIT, MAX_QUERY_LIMIT)
+    except ValueError as e:
+        return Response(
+            {'error': str(e)},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    try:
+        index = load_upload_index(upload)
+    except Exception as e:
+        return Response(
+            {'error': str(e)},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+    
+    ids, count, count_exact = index.name_search.search(query, limit, offset)
+    
+    return Response({
+        'id': upload.id,
+        'uploaded_at': upload.uploaded_at,
+        'query': query,
+        'count': count,
+        'count_exact': count_exact,
+        'data': index.rows(ids),
+    })
+
+def iter_export(upload, query, write):
+    # The dataset, and for filtered or sorted exports its index, is loaded
+    # once the response is being sent rather than before it exists. A plain
+    # export on a cache miss reads the dataset in file order and never
+    # builds the index's sort permutations.
+    from .indexes import cached_dataset_index
+    
+    index = cached_dataset_index((upload.id, upload.append_count))
+    filtered = query['types'] is not None or query['sort'] or any(
+        bounds != (None, None) for bounds in query['ranges'].values()
+    )
+    if index is None and not filtered:
+        import numpy as np
+        
+        dataset = load_upload_dataset(upload)
+        ids = np.arange(len(dataset))
+    else:
+        if index is None:
+            index = load_upload_index(upload)
+        # Filters and sort match the query endpoint; exports are never paginated.
+        dataset, ids = index.dataset, run_query(index, query)
+    yield from write(dataset, ids)
+
+@api_view(['GET'])
+def export_upload(request, upload_id, export_format):
+    upload = EquipmentUpload.objects.filter(pk=upload_id).first()
+    if not upload:
+        return Response(
+            {'error': 'Upload not found'},
+            status=status.HTTP_404_NOT_FOUND
+        )
+    
+    if export_format not in ('csv', 'xlsx'):
+        return Response(
+            {'error': 'Export format must be csv or xlsx'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    if export_format == 'xlsx':
+        try:
+            import openpyxl  # noqa: F401
+        except ImportError:
+            return Response(
+                {'error': 'XLSX export requires openpyxl to be installed'},
+                status=status.HTTP_501_NOT_IMPLEMENTED
+            )
+    
+    try:
+        query = parse_query_params(request.query_params)
+    except ValueError as e:
+        return Response(
+            {'error': str(e)},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    filename = f'equipment_upload_{upload.id}.{export_format}'
+    
+    if export_format == 'xlsx':
+        chunks = iter_export(upload, query, iter_xlsx)
+        content_type = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    else:
+        chunks = iter_export(upload, query, iter_csv)
+        content_type = 'text/csv'
+        if request.query_params.get('gzip') in ('1', 'true'):
+            chunks = iter_gzip(chunks)
+            content_type = 'application/gzip'
+            filename += '.gz'
+    
+    response = StreamingHttpResponse(chunks, content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+def upload_events(request):
+    # Server-Sent Events feed of upload created/updated/deleted notifications.
+    # config/asgi.py serves this path without Django under ASGI; this view
+    # covers WSGI servers such as runserver.
+    if isinstance(request, ASGIRequest):
+        stream = async_event_stream()
+    else:
+        stream = event_stream()
+    
+    response = StreamingHttpResponse(stream, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
 @api_view(['GET'])
 def get_history(request):
     uploads = EquipmentUpload.objects.order_by('-uploaded_at')[:5]
@@ -128,6 +670,71 @@ def get_history(request):
     ]
     return Response(history)
 
+def backfill_partials(uploads):
+    # Parses the CSVs of uploads stored without running aggregates, in
+    # parallel, and saves the result so later calls read it from the row.
+    entries, errors = [], []
+    for upload in uploads:
+        try:
+            with upload.csv_file.open('rb') as handle:
+                entries.append({'upload': upload, 'data': handle.read()})
+        except (OSError, ValueError) as e:
+            errors.append({'id': upload.id, 'error': str(e)})
+    
+    for entry, result in zip(entries, parse_batch(entries)):
+        upload = entry['upload']
+        if 'error' in result:
+            errors.append({'id': upload.id, 'error': result['error']})
+            continue
+        # Written without save() so no upload.updated event goes out, and
+        # skipped if an append materialised the upload in the meantime, in
+        # which case the row already holds newer aggregates.
+        if EquipmentUpload.objects.filter(pk=upload.pk, append_count=0).update(**result['aggregates']):
+            for field, value in result['aggregates'].items():
+                setattr(upload, field, value)
+            continue
+        try:
+            upload.refresh_from_db()
+        except EquipmentUpload.DoesNotExist:
+            errors.append({'id': upload.id, 'error': 'Upload was deleted'})
+    return errors
+
+@api_view(['GET'])
+def get_fleet_stats(request):
+    weighting = request.query_params.get('weighting', 'rows')
+    if weighting not in WEIGHTINGS:
+        return Response(
+            {'error': f"weighting must be one of: {', '.join(WEIGHTINGS)}"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    uploads = list(EquipmentUpload.objects.all())
+    if not uploads:
+        return Response(
+            {'error': 'No uploads found'},
+            status=status.HTTP_404_NOT_FOUND
+        )
+    
+    stale = [upload for upload in uploads if needs_backfill(upload)]
+    try:
+        errors = backfill_partials(stale) if stale else []
+    except Exception as e:
+        return Response(
+            {'error': str(e)},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+    
+    failed = {error['id'] for error in errors}
+    included = [upload for upload in uploads if upload.id not in failed]
+    
+    return Response({
+        'uploads': [upload.id for upload in included],
+        'weighting': weighting,
+        'backfilled': len(stale) - len(failed),
+        'stats': merge_partials([upload_partial(upload) for upload in included], weighting),
+        'errors': errors,
+    })
+
 @api_view(['GET'])
 def generate_pdf(request):
     try:
@@ -139,7 +746,7 @@ def generate_pdf(request):
                 status=status.HTTP_404_NOT_FOUND
             )
         
-        result, error = parse_csv_and_calculate_stats(latest_upload.csv_file)
+        _, stats, error = load_upload_stats(latest_upload)
         
         if error:
             return Response(
@@ -147,66 +754,11 @@ def generate_pdf(request):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
         
-        buffer = io.BytesIO()
-        doc = SimpleDocTemplate(buffer, pagesize=letter)
-        elements = []
-        styles = getSampleStyleSheet()
-        
-        title = Paragraph("Chemical Equipment Summary Report", styles['Title'])
-        elements.append(title)
-        elements.append(Spacer(1, 0.3 * inch))
-        
-        stats = result['stats']
+        # ReportLab is only loaded by workers that actually render a report.
+        from .reports import build_summary_pdf
+        pdf = build_summary_pdf(stats)
         
-        summary_data = [
-            ['Metric', 'Value'],
-            ['Total Equipment', str(stats['total_equipment'])],
-            ['Average Flowrate', f"{stats['average_flowrate']:.2f}"],
-            ['Average Pressure', f"{stats['average_pressure']:.2f}"],
-            ['Average Temperature', f"{stats['average_temperature']:.2f}"]
-        ]
-        
-        summary_table = Table(summary_data, colWidths=[3*inch, 2*inch])
-        summary_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 12),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ]))
-        
-        elements.append(summary_table)
-        elements.append(Spacer(1, 0.3 * inch))
-        
-        subtitle = Paragraph("Equipment Type Distribution", styles['Heading2'])
-        elements.append(subtitle)
-        elements.append(Spacer(1, 0.2 * inch))
-        
-        dist_data = [['Equipment Type', 'Count']]
-        for eq_type, count in stats['equipment_distribution'].items():
-            dist_data.append([str(eq_type), str(count)])
-        
-        dist_table = Table(dist_data, colWidths=[3*inch, 2*inch])
-        dist_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 12),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.lightblue),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ]))
-        
-        elements.append(dist_table)
-        
-        doc.build(elements)
-        buffer.seek(0)
-        
-        response = HttpResponse(buffer.getvalue(), content_type='application/pdf')
+        response = HttpResponse(pdf, content_type='application/pdf')
         response['Content-Disposition'] = 'attachment; filename="equipment_report.pdf"'
         
         return response
@@ -0,0 +1,27 @@
+import gc
+import io
+
+SAMPLE_CSV = (
+    "Equipment Name,Type,Flowrate,Pressure,Temperature\n"
+    "Pump-1,Pump,120.0,5.2,110.0\n"
+    "Reactor-1,Reactor,150.5,6.1,130.0\n"
+)
+
+def warm_up():
+    # Meant to run once in the server's master process before it forks:
+    # importing and exercising pandas, NumPy and ReportLab here lets every
+    # worker share those pages copy-on-write instead of loading its own.
+    from .indexes import DatasetIndex
+    from .reports import build_summary_pdf
+    from .views import parse_csv_and_calculate_stats
+
+    result, error = parse_csv_and_calculate_stats(io.StringIO(SAMPLE_CSV))
+    if error:
+        raise RuntimeError(f"Warmup sample could not be parsed: {error}")
+    DatasetIndex(result['dataset']).warm()
+    build_summary_pdf(result['stats'])
+
+    # Move everything loaded so far out of the collector's reach, so later
+    # collections in the workers do not touch (and un-share) those pages.
+    gc.collect()
+    gc.freeze()
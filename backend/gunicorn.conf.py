@@ -0,0 +1,41 @@
+import os
+import shutil
+import tempfile
+
+bind = os.getenv('GUNICORN_BIND', '127.0.0.1:8000')
+workers = int(os.getenv('GUNICORN_WORKERS', '4'))
+
+# Uvicorn workers serve the ASGI app, where an open /api/events/ stream is a
+# parked coroutine. A sync worker would be pinned by each stream and killed
+# when it outlived the worker timeout.
+worker_class = 'uvicorn.workers.UvicornWorker'
+wsgi_app = 'config.asgi:application'
+
+# With EQUIPMENT_PRELOAD=1 the app is imported and warmed up in the master
+# before workers are forked, so they share pandas/ReportLab memory.
+preload_app = os.getenv('EQUIPMENT_PRELOAD', '0') == '1'
+
+# Workers relay upload events to each other through sockets in this
+# directory, so a stream sees every upload whichever worker handled it.
+events_relay_dir = None
+
+def on_starting(server):
+    global events_relay_dir
+    events_relay_dir = tempfile.mkdtemp(prefix='equipment-events-')
+
+def when_ready(server):
+    if preload_app:
+        from equipment.warmup import warm_up
+        warm_up()
+        server.log.info("Preloaded pandas, NumPy and ReportLab before forking workers")
+
+def post_worker_init(worker):
+    from equipment.events import broker
+    broker.join_relay(events_relay_dir)
+
+def worker_exit(server, worker):
+    from equipment.events import broker
+    broker.leave_relay()
+
+def on_exit(server):
+    shutil.rmtree(events_relay_dir, ignore_errors=True)
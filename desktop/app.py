@@ -1,19 +1,98 @@
-import os
 import sys
-import requests
+from PyQt5.QtCore import QObject, QThread, pyqtSignal, pyqtSlot
 from PyQt5.QtWidgets import (
-    QApplication, QWidget, QPushButton,
-    QLabel, QFileDialog, QVBoxLayout
+    QApplication, QWidget, QPushButton, QComboBox,
+    QLabel, QFileDialog, QVBoxLayout, QHBoxLayout, QProgressBar
 )
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+from matplotlib.backends.backend_qt5agg import NavigationToolbar2QT as NavigationToolbar
 from matplotlib.figure import Figure
 
-API_UPLOAD_URL = os.getenv("CHEM_EQUIP_API_URL", "http://localhost:8000/api/upload/")
+from charts import (
+    DensityScatter, LevelOfDetailHistogram, ScatterGrid, extract_columns, sorted_finite
+)
+from client import CancelEvent, UploadCancelled, UploadClient, UploadError
+
+DISTRIBUTION_VIEW = "Type distribution"
+SCATTER_VIEWS = {
+    "Scatter: Flowrate vs Pressure": ("Flowrate", "Pressure"),
+    "Scatter: Flowrate vs Temperature": ("Flowrate", "Temperature"),
+    "Scatter: Pressure vs Temperature": ("Pressure", "Temperature"),
+}
+HISTOGRAM_VIEWS = {
+    f"Histogram: {column}": column
+    for column in ("Flowrate", "Pressure", "Temperature")
+}
+
+
+class UploadWorker(QObject):
+    progress = pyqtSignal(int, int)
+    succeeded = pyqtSignal(dict)
+    failed = pyqtSignal(str)
+    cancelled = pyqtSignal()
+    finished = pyqtSignal()
+
+    def __init__(self, client, file_path):
+        super().__init__()
+        self.client = client
+        self.file_path = file_path
+        self.cancel_event = CancelEvent()
+        self._last_percent = -1
+
+    def _report_progress(self, sent, total):
+        # Only signal the GUI when the visible percentage changes.
+        percent = sent * 100 // total if total else 100
+        if percent != self._last_percent:
+            self._last_percent = percent
+            self.progress.emit(sent, total)
+
+    @pyqtSlot()
+    def run(self):
+        try:
+            data = self.client.upload(
+                self.file_path,
+                progress=self._report_progress,
+                cancel_event=self.cancel_event,
+            )
+            # Convert rows to arrays, and bucket and sort them for the charts,
+            # here rather than on the GUI thread.
+            columns = extract_columns(data.get("data") or [])
+            data["scatter_grids"] = {
+                view: ScatterGrid(columns[x_column], columns[y_column])
+                for view, (x_column, y_column) in SCATTER_VIEWS.items()
+            }
+            data["sorted_columns"] = {
+                column: sorted_finite(columns[column]) for column in HISTOGRAM_VIEWS.values()
+            }
+            # The server may answer after a cancel that came too late to stop the body.
+            if self.cancel_event.is_set():
+                self.cancelled.emit()
+            else:
+                self.succeeded.emit(data)
+        except UploadCancelled:
+            self.cancelled.emit()
+        except UploadError as exc:
+            self.failed.emit(f"Upload failed: {exc}")
+        except Exception as exc:
+            self.failed.emit(f"Unexpected error: {exc}")
+        finally:
+            self.finished.emit()
+
+    def cancel(self):
+        self.cancel_event.set()
+
 
 class DesktopApp(QWidget):
-    def __init__(self):
+    def __init__(self, client=None):
         super().__init__()
         self.setWindowTitle("Chemical Equipment Visualizer (Desktop)")
+        self.client = client or UploadClient()
+        self.upload_thread = None
+        self.upload_worker = None
+        self.stats = {}
+        self.scatter_grids = {}
+        self.sorted_columns = {}
+        self.chart = None
 
         layout = QVBoxLayout()
         self.label = QLabel("Upload a CSV file to analyze equipment data")
@@ -21,11 +100,31 @@ class DesktopApp(QWidget):
         self.button = QPushButton("Upload CSV")
         self.button.clicked.connect(self.upload_csv)
 
+        self.cancel_button = QPushButton("Cancel")
+        self.cancel_button.setEnabled(False)
+        self.cancel_button.clicked.connect(self.cancel_upload)
+
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setRange(0, 100)
+        self.progress_bar.setValue(0)
+
+        self.view_selector = QComboBox()
+        self.view_selector.addItems([DISTRIBUTION_VIEW, *SCATTER_VIEWS, *HISTOGRAM_VIEWS])
+        self.view_selector.currentTextChanged.connect(self.show_view)
+
         self.figure = Figure(figsize=(5, 4))
         self.canvas = FigureCanvas(self.figure)
+        self.toolbar = NavigationToolbar(self.canvas, self)
+
+        buttons = QHBoxLayout()
+        buttons.addWidget(self.button)
+        buttons.addWidget(self.cancel_button)
 
         layout.addWidget(self.label)
-        layout.addWidget(self.button)
+        layout.addLayout(buttons)
+        layout.addWidget(self.progress_bar)
+        layout.addWidget(self.view_selector)
+        layout.addWidget(self.toolbar)
         layout.addWidget(self.canvas)
         self.setLayout(layout)
 
@@ -33,62 +132,112 @@ class DesktopApp(QWidget):
         file_path, _ = QFileDialog.getOpenFileName(self, "Select CSV File")
         if not file_path:
             return
+        self.start_upload(file_path)
+
+    def start_upload(self, file_path):
+        if self.upload_thread is not None:
+            return
 
         self.button.setEnabled(False)
+        self.cancel_button.setEnabled(True)
+        self.progress_bar.setValue(0)
         self.label.setText("Uploading...")
 
-        try:
-            with open(file_path, "rb") as handle:
-                response = requests.post(
-                    API_UPLOAD_URL,
-                    files={"file": handle},
-                    timeout=20,
-                )
-
-            if response.status_code >= 400:
-                try:
-                    payload = response.json()
-                    error_message = payload.get("error", response.text)
-                except ValueError:
-                    error_message = response.text
-                self.label.setText(f"Upload failed: {error_message}")
-                return
-
-            try:
-                data = response.json()
-            except ValueError:
-                self.label.setText("Upload failed: invalid JSON response")
-                return
-
-            stats = data.get("stats", {})
-            total = stats.get("total_equipment", "N/A")
-            avg_flowrate = stats.get("average_flowrate", "N/A")
-            avg_pressure = stats.get("average_pressure", "N/A")
-            avg_temperature = stats.get("average_temperature", "N/A")
-
-            self.label.setText(
-                "Upload successful\n"
-                f"Total: {total}\n"
-                f"Avg Flowrate: {avg_flowrate}\n"
-                f"Avg Pressure: {avg_pressure}\n"
-                f"Avg Temperature: {avg_temperature}"
-            )
+        # Network I/O runs on a worker thread; results come back as queued
+        # signals so the GUI thread only ever touches widgets.
+        self.upload_thread = QThread(self)
+        self.upload_worker = UploadWorker(self.client, file_path)
+        self.upload_worker.moveToThread(self.upload_thread)
+        self.upload_thread.started.connect(self.upload_worker.run)
+        self.upload_worker.progress.connect(self.on_upload_progress)
+        self.upload_worker.succeeded.connect(self.on_upload_succeeded)
+        self.upload_worker.failed.connect(self.label.setText)
+        self.upload_worker.cancelled.connect(self.on_upload_cancelled)
+        self.upload_worker.finished.connect(self.upload_thread.quit)
+        self.upload_thread.finished.connect(self.on_upload_finished)
+        self.upload_thread.start()
+
+    def cancel_upload(self):
+        if self.upload_worker is not None:
+            self.cancel_button.setEnabled(False)
+            self.label.setText("Cancelling...")
+            self.upload_worker.cancel()
+
+    def on_upload_progress(self, sent, total):
+        percent = int(sent * 100 / total) if total else 0
+        self.progress_bar.setValue(percent)
+        self.label.setText(f"Uploading... {sent // 1024} / {total // 1024} KB")
+
+    def on_upload_cancelled(self):
+        self.progress_bar.setValue(0)
+        self.label.setText("Upload cancelled")
 
-            distribution = stats.get("equipment_distribution", {})
-            self.figure.clear()
-            ax = self.figure.add_subplot(111)
+    def on_upload_finished(self):
+        self.upload_worker.deleteLater()
+        self.upload_thread.deleteLater()
+        self.upload_worker = None
+        self.upload_thread = None
+        self.button.setEnabled(True)
+        self.cancel_button.setEnabled(False)
+
+    def on_upload_succeeded(self, data):
+        self.progress_bar.setValue(100)
+        stats = data.get("stats", {})
+        total = stats.get("total_equipment", "N/A")
+        avg_flowrate = stats.get("average_flowrate", "N/A")
+        avg_pressure = stats.get("average_pressure", "N/A")
+        avg_temperature = stats.get("average_temperature", "N/A")
+
+        self.label.setText(
+            "Upload successful\n"
+            f"Total: {total}\n"
+            f"Avg Flowrate: {avg_flowrate}\n"
+            f"Avg Pressure: {avg_pressure}\n"
+            f"Avg Temperature: {avg_temperature}"
+        )
+
+        self.stats = stats
+        self.scatter_grids = data.get("scatter_grids", {})
+        self.sorted_columns = data.get("sorted_columns", {})
+        self.show_view(self.view_selector.currentText())
+
+    def show_view(self, view):
+        if self.chart is not None:
+            self.chart.disconnect()
+            self.chart = None
+        self.figure.clear()
+        ax = self.figure.add_subplot(111)
+
+        if view in SCATTER_VIEWS and self.scatter_grids:
+            x_column, y_column = SCATTER_VIEWS[view]
+            self.chart = DensityScatter(ax, self.scatter_grids[view], x_column, y_column)
+        elif view in HISTOGRAM_VIEWS and self.sorted_columns:
+            column = HISTOGRAM_VIEWS[view]
+            self.chart = LevelOfDetailHistogram(ax, self.sorted_columns[column], column)
+        elif view == DISTRIBUTION_VIEW and self.stats:
+            distribution = self.stats.get("equipment_distribution", {})
             if distribution:
                 ax.bar(distribution.keys(), distribution.values())
                 ax.set_title("Equipment Type Distribution")
             else:
                 ax.set_title("No equipment distribution data")
-            self.canvas.draw()
-        except requests.RequestException as exc:
-            self.label.setText(f"Upload failed: {exc}")
-        except Exception as exc:
-            self.label.setText(f"Unexpected error: {exc}")
-        finally:
-            self.button.setEnabled(True)
+        else:
+            ax.set_title("Upload a CSV to see this chart")
+        # Zoom/pan history belongs to the previous axes.
+        self.toolbar.update()
+        self.canvas.draw_idle()
+
+    def closeEvent(self, event):
+        if self.upload_worker is not None:
+            # Cancelling shuts the socket down, so the worker unwinds promptly
+            # (at worst after CONNECT_TIMEOUT while still connecting). The
+            # thread is a child of this widget and must not be destroyed
+            # while it runs, hence the unbounded wait.
+            self.upload_worker.cancel()
+            self.upload_thread.quit()
+            self.upload_thread.wait()
+        self.client.close()
+        super().closeEvent(event)
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
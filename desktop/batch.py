@@ -0,0 +1,218 @@
+"""Headless batch upload of every CSV in a directory.
+
+Usage: python batch.py DIRECTORY [--workers N] [--retries N] [--report PATH]
+"""
+import argparse
+import hashlib
+import json
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from client import API_UPLOAD_URL, UploadClient, UploadError
+
+DEFAULT_WORKERS = 4
+DEFAULT_RETRIES = 3
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 30.0
+CACHE_FILENAME = ".upload_cache.json"
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def file_digest(file_path):
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def hash_file(file_path):
+    # A file that vanished or cannot be read fails on its own instead of
+    # aborting the whole run from inside the executor.
+    try:
+        size = os.path.getsize(file_path)
+        return file_digest(file_path), size, None
+    except OSError as exc:
+        return None, 0, exc
+
+
+def failed_result(file_path, exc, size=0, attempts=0):
+    return {
+        "file": file_path,
+        "status": "failed",
+        "bytes": size,
+        "attempts": attempts,
+        "error": str(exc),
+    }
+
+
+class UploadCache:
+    # Content hashes of files already uploaded, persisted as JSON so renamed
+    # or re-exported copies of the same data are skipped too.
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        try:
+            with open(path, "r", encoding="utf-8") as handle:
+                self.entries = json.load(handle)
+        except FileNotFoundError:
+            self.entries = {}
+
+    def __contains__(self, digest):
+        with self.lock:
+            return digest in self.entries
+
+    def add(self, digest, file_path, upload_id):
+        with self.lock:
+            self.entries[digest] = {
+                "file": os.path.basename(file_path),
+                "upload_id": upload_id,
+                "uploaded_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            }
+            # Written after every success so an interrupted run keeps its progress.
+            temp_path = f"{self.path}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as handle:
+                json.dump(self.entries, handle, indent=2)
+            os.replace(temp_path, self.path)
+
+
+def is_retryable(exc):
+    # Network failures and server errors are retried; 4xx means the file
+    # itself was rejected and will fail the same way again.
+    return exc.status_code is None or exc.status_code >= 500
+
+
+def upload_with_retry(client, file_path, retries, backoff_base=BACKOFF_BASE, sleep=time.sleep):
+    attempt = 0
+    while True:
+        try:
+            return client.upload(file_path), attempt + 1
+        except UploadError as exc:
+            if attempt >= retries or not is_retryable(exc):
+                exc.attempts = attempt + 1
+                raise
+            delay = min(backoff_base * (2 ** attempt), BACKOFF_MAX)
+            sleep(delay + random.uniform(0, delay / 2))
+            attempt += 1
+
+
+def find_csv_files(directory):
+    return sorted(
+        os.path.join(directory, name)
+        for name in os.listdir(directory)
+        if name.lower().endswith(".csv") and os.path.isfile(os.path.join(directory, name))
+    )
+
+
+def run_batch(directory, url=API_UPLOAD_URL, workers=DEFAULT_WORKERS,
+              retries=DEFAULT_RETRIES, cache_path=None, backoff_base=BACKOFF_BASE):
+    cache = UploadCache(cache_path or os.path.join(directory, CACHE_FILENAME))
+    client = UploadClient(url=url, pool_size=workers)
+    results = []
+    started = time.perf_counter()
+
+    def process(file_path, digest, size):
+        transfer_started = time.perf_counter()
+        try:
+            data, attempts = upload_with_retry(client, file_path, retries, backoff_base)
+        except UploadError as exc:
+            return failed_result(file_path, exc, size, getattr(exc, "attempts", 1))
+        except OSError as exc:
+            # The file changed under us; retrying would not help.
+            return failed_result(file_path, exc, size, 1)
+        cache.add(digest, file_path, data.get("id"))
+        return {
+            "file": file_path,
+            "status": "uploaded",
+            "bytes": size,
+            "attempts": attempts,
+            "upload_id": data.get("id"),
+            "seconds": round(time.perf_counter() - transfer_started, 3),
+        }
+
+    def report(result):
+        results.append(result)
+        print(f"{result['status']:>8}  {os.path.basename(result['file'])}", flush=True)
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            paths = find_csv_files(directory)
+            # Hash everything first so identical files within one run are
+            # uploaded once rather than racing each other.
+            pending = {}
+            for file_path, (digest, size, error) in zip(paths, executor.map(hash_file, paths)):
+                if error is not None:
+                    report(failed_result(file_path, error))
+                elif digest in cache or digest in pending:
+                    report({"file": file_path, "status": "skipped", "bytes": size})
+                else:
+                    pending[digest] = (file_path, size)
+
+            futures = [
+                executor.submit(process, path, digest, size)
+                for digest, (path, size) in pending.items()
+            ]
+            for future in as_completed(futures):
+                report(future.result())
+    finally:
+        client.close()
+
+    return build_report(results, time.perf_counter() - started)
+
+
+def build_report(results, elapsed):
+    uploaded = [result for result in results if result["status"] == "uploaded"]
+    failed = [result for result in results if result["status"] == "failed"]
+    uploaded_bytes = sum(result["bytes"] for result in uploaded)
+    return {
+        "files": len(results),
+        "uploaded": len(uploaded),
+        "skipped": sum(1 for result in results if result["status"] == "skipped"),
+        "failed": len(failed),
+        "uploaded_bytes": uploaded_bytes,
+        "elapsed_seconds": round(elapsed, 3),
+        "throughput_mb_per_second": round(uploaded_bytes / elapsed / 1e6, 3) if elapsed else 0.0,
+        "files_per_second": round(len(uploaded) / elapsed, 3) if elapsed else 0.0,
+        "failures": [
+            {"file": result["file"], "attempts": result["attempts"], "error": result["error"]}
+            for result in failed
+        ],
+        "results": sorted(results, key=lambda result: result["file"]),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Upload every CSV in a directory.")
+    parser.add_argument("directory")
+    parser.add_argument("--url", default=API_UPLOAD_URL)
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help="concurrent transfers / pooled connections")
+    parser.add_argument("--retries", type=int, default=DEFAULT_RETRIES)
+    parser.add_argument("--cache", help=f"hash cache path (default: DIRECTORY/{CACHE_FILENAME})")
+    parser.add_argument("--report", default="upload_report.json")
+    args = parser.parse_args(argv)
+
+    report = run_batch(
+        args.directory,
+        url=args.url,
+        workers=max(args.workers, 1),
+        retries=max(args.retries, 0),
+        cache_path=args.cache,
+    )
+    with open(args.report, "w", encoding="utf-8") as handle:
+        json.dump(report, handle, indent=2)
+
+    print(
+        f"{report['uploaded']} uploaded, {report['skipped']} skipped, "
+        f"{report['failed']} failed in {report['elapsed_seconds']}s "
+        f"({report['throughput_mb_per_second']} MB/s); report written to {args.report}"
+    )
+    return 1 if report["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
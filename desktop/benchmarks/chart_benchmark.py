@@ -0,0 +1,151 @@
+"""GUI-thread cost of the desktop charts at fixed point counts.
+
+Usage: python benchmarks/chart_benchmark.py [--points N [N ...]] [--repeats N]
+
+Draws offscreen with the Agg canvas, the renderer behind the Qt one, on a
+single reused figure as the app does. For each point count it times the
+worker-thread preparation (ScatterGrid and sorted_finite) once, then the
+GUI-thread steps of a scatter and a histogram view: building the view
+(show_view), its first draw (the deferred draw_idle), a zoom into the
+densest area and the full zoom-out back. Each GUI step runs as its own
+event-loop callback and should stay within BUDGET_MS at the 90th
+percentile whatever the point count; the preparation grows with it.
+"""
+import argparse
+import gc
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+import matplotlib
+
+matplotlib.use("Agg")
+
+from matplotlib.backends.backend_agg import FigureCanvasAgg  # noqa: E402
+from matplotlib.figure import Figure  # noqa: E402
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from charts import DensityScatter, LevelOfDetailHistogram, ScatterGrid, sorted_finite  # noqa: E402
+
+BUDGET_MS = 50
+STEPS = ["show view", "first draw", "zoom in", "full zoom-out"]
+
+
+def sample_points(count, seed=0):
+    rng = np.random.default_rng(seed)
+    flowrate = rng.lognormal(5, 0.4, count)
+    pressure = flowrate * 0.02 + rng.normal(5, 1, count)
+    pressure[rng.random(count) < 0.01] = np.nan
+    return flowrate, pressure
+
+
+def timed(action):
+    # Garbage left by earlier steps is not this step's cost.
+    gc.collect()
+    started = time.perf_counter()
+    action()
+    return (time.perf_counter() - started) * 1000
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+class Window:
+    """The parts of the app window a chart view touches."""
+
+    def __init__(self):
+        # The desktop app's figure size.
+        self.figure = Figure(figsize=(5, 4))
+        self.canvas = FigureCanvasAgg(self.figure)
+        self.ax = None
+
+    def show_view(self, make_chart):
+        self.figure.clear()
+        self.ax = self.figure.add_subplot(111)
+        make_chart(self.ax)
+
+    def zoom(self, xlim, ylim=None):
+        self.ax.set_xlim(xlim)
+        if ylim is not None:
+            self.ax.set_ylim(ylim)
+        self.canvas.draw()
+
+
+def view_timings(window, make_chart, zooms, repeats):
+    timings = {step: [] for step in STEPS}
+    for _ in range(repeats):
+        timings["show view"].append(timed(lambda: window.show_view(make_chart)))
+        timings["first draw"].append(timed(window.canvas.draw))
+        full = window.ax.get_xlim(), window.ax.get_ylim()
+        for limits in zooms:
+            timings["zoom in"].append(timed(lambda: window.zoom(*limits)))
+            timings["full zoom-out"].append(timed(lambda: window.zoom(*full)))
+    return timings
+
+
+def scatter_zooms(grid):
+    # Around the densest area, down to a few hundred raw points.
+    x_center = grid.xlim[0] + (grid.xlim[1] - grid.xlim[0]) * 0.3
+    y_center = grid.ylim[0] + (grid.ylim[1] - grid.ylim[0]) * 0.5
+    return [
+        ((x_center * (1 - width), x_center * (1 + width)), (y_center * (1 - width), y_center * (1 + width)))
+        for width in (0.2, 0.02)
+    ]
+
+
+def histogram_zooms(values):
+    middle = float(np.median(values))
+    return [((middle * 0.9, middle * 1.1),), ((middle * 0.99, middle * 1.01),)]
+
+
+def report(chart, timings):
+    worst = 0.0
+    for step, values in timings.items():
+        p90 = percentile(values, 0.9)
+        worst = max(worst, p90)
+        print(
+            f"  {chart:<9} {step:<14} median {statistics.median(values):6.1f} ms"
+            f"   p90 {p90:6.1f} ms   max {max(values):6.1f} ms"
+        )
+    return worst
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--points", type=int, nargs="+", default=[10_000, 1_000_000])
+    parser.add_argument("--repeats", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    window = Window()
+    # Font loading and other one-off setup belong to no particular step.
+    window.show_view(lambda ax: DensityScatter(ax, ScatterGrid(*sample_points(1000)), "Flowrate", "Pressure"))
+    window.canvas.draw()
+
+    worst = 0.0
+    for count in args.points:
+        x, y = sample_points(count)
+        prepared = {}
+        prepare_ms = timed(lambda: prepared.update(grid=ScatterGrid(x, y), values=sorted_finite(x)))
+        grid, values = prepared["grid"], prepared["values"]
+        print(f"{count:,} points (worker-thread preparation {prepare_ms:.0f} ms)")
+
+        scatter = view_timings(
+            window, lambda ax: DensityScatter(ax, grid, "Flowrate", "Pressure"), scatter_zooms(grid), args.repeats
+        )
+        histogram = view_timings(
+            window, lambda ax: LevelOfDetailHistogram(ax, values, "Flowrate"), histogram_zooms(values), args.repeats
+        )
+        worst = max(worst, report("scatter", scatter), report("histogram", histogram))
+
+    verdict = "within" if worst <= BUDGET_MS else "over"
+    print(f"Slowest GUI step at p90 {worst:.1f} ms, {verdict} the {BUDGET_MS} ms budget")
+    return 0 if worst <= BUDGET_MS else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,273 @@
+import math
+
+import numpy as np
+from matplotlib.ticker import MaxNLocator
+
+NUMERIC_COLUMNS = ["Flowrate", "Pressure", "Temperature"]
+
+# Fine grid the scatter data is bucketed into once, at load time.
+GRID_SIZE = 512
+# Largest density image handed to matplotlib; finer views are block-summed.
+DISPLAY_BINS = 256
+# Views holding at most this many points draw them individually.
+RAW_POINT_LIMIT = 20000
+HISTOGRAM_BINS = 80
+# Individual values are marked under the histogram below this many.
+RUG_POINT_LIMIT = 2000
+# Tick labels are most of the cost of a redraw, so axes get fewer of them.
+TICK_BINS = 5
+
+
+def extract_columns(rows):
+    # Run on the upload worker thread so the GUI never walks the row dicts.
+    count = len(rows)
+    columns = {}
+    for column in NUMERIC_COLUMNS:
+        values = np.fromiter(
+            (_to_float(row.get(column)) for row in rows), dtype=np.float64, count=count
+        )
+        columns[column] = values
+    return columns
+
+
+def sorted_finite(values):
+    # What LevelOfDetailHistogram reads; sorted on the worker thread too.
+    return np.sort(values[np.isfinite(values)])
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def _label_axes(ax, xlabel, ylabel, title):
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel(ylabel)
+    # A fixed title position saves measuring the tick labels on every draw;
+    # ticks are never drawn above the axes anyway.
+    ax.set_title(title, y=1.0)
+    ax.xaxis.set_major_locator(MaxNLocator(TICK_BINS))
+    ax.yaxis.set_major_locator(MaxNLocator(TICK_BINS))
+
+
+def _padded_limits(values):
+    low, high = float(values.min()), float(values.max())
+    if low == high:
+        low, high = low - 0.5, high + 0.5
+    margin = (high - low) * 0.02
+    return low - margin, high + margin
+
+
+class BlitCrosshair:
+    """Crosshair and value readout drawn with blitting.
+
+    The static plot is cached after every full draw, so mouse movement only
+    restores that background and repaints two lines and a label.
+    """
+
+    def __init__(self, ax, xlabel, ylabel):
+        self.ax = ax
+        self.canvas = ax.figure.canvas
+        self.xlabel = xlabel
+        self.ylabel = ylabel
+        self.background = None
+        self.vline = ax.axvline(color="0.3", linewidth=0.8, animated=True, visible=False)
+        self.hline = ax.axhline(color="0.3", linewidth=0.8, animated=True, visible=False)
+        self.text = ax.text(
+            0.01, 0.99, "", transform=ax.transAxes, va="top", animated=True,
+            bbox={"facecolor": "white", "alpha": 0.8, "edgecolor": "none"},
+        )
+        self.connections = [
+            self.canvas.mpl_connect("draw_event", self.on_draw),
+            self.canvas.mpl_connect("motion_notify_event", self.on_move),
+        ]
+
+    def on_draw(self, event):
+        self.background = self.canvas.copy_from_bbox(self.ax.bbox)
+
+    def on_move(self, event):
+        if self.background is None:
+            return
+        inside = event.inaxes is self.ax
+        self.canvas.restore_region(self.background)
+        if inside:
+            self.vline.set_xdata([event.xdata, event.xdata])
+            self.hline.set_ydata([event.ydata, event.ydata])
+            self.text.set_text(f"{self.xlabel}: {event.xdata:.2f}\n{self.ylabel}: {event.ydata:.2f}")
+            for artist in (self.vline, self.hline, self.text):
+                artist.set_visible(True)
+                self.ax.draw_artist(artist)
+        self.canvas.blit(self.ax.bbox)
+
+    def disconnect(self):
+        for connection in self.connections:
+            self.canvas.mpl_disconnect(connection)
+
+
+class ScatterGrid:
+    """Finite points of one scatter view bucketed into a grid.
+
+    Points are ordered by cell of a GRID_SIZE x GRID_SIZE grid over their
+    padded extent. Built on the upload worker thread, so showing or zooming
+    a scatter view on the GUI thread only reads per-cell slices.
+    """
+
+    def __init__(self, x, y):
+        finite = np.isfinite(x) & np.isfinite(y)
+        x, y = x[finite], y[finite]
+        self.size = len(x)
+        if not self.size:
+            return
+
+        self.xlim = _padded_limits(x)
+        self.ylim = _padded_limits(y)
+        self.x_step = (self.xlim[1] - self.xlim[0]) / GRID_SIZE
+        self.y_step = (self.ylim[1] - self.ylim[0]) / GRID_SIZE
+        ix = np.clip(((x - self.xlim[0]) / self.x_step).astype(np.intp), 0, GRID_SIZE - 1)
+        iy = np.clip(((y - self.ylim[0]) / self.y_step).astype(np.intp), 0, GRID_SIZE - 1)
+        cells = ix * GRID_SIZE + iy
+        order = np.argsort(cells, kind="stable")
+        self.x, self.y = x[order], y[order]
+        self.cell_offsets = np.searchsorted(cells[order], np.arange(GRID_SIZE * GRID_SIZE + 1))
+        self.counts = np.diff(self.cell_offsets).reshape(GRID_SIZE, GRID_SIZE)
+
+
+class DensityScatter:
+    """Scatter plot that switches between a density image and raw points.
+
+    Both the per-view density and the raw points inside the view are read
+    from a ScatterGrid's precomputed slices rather than by scanning every
+    point, so a redraw costs the same whatever the dataset size.
+    """
+
+    def __init__(self, ax, grid, xlabel, ylabel):
+        self.ax = ax
+        self.grid = grid
+        self.size = grid.size
+
+        _label_axes(ax, xlabel, ylabel, f"{ylabel} vs {xlabel}")
+        self.points, = ax.plot([], [], linestyle="none", marker=".", markersize=2)
+        self.image = ax.imshow(
+            np.ma.masked_all((1, 1)), origin="lower", aspect="auto",
+            interpolation="nearest", cmap="viridis", visible=False,
+        )
+        self.crosshair = BlitCrosshair(ax, xlabel, ylabel)
+
+        if not self.size:
+            ax.set_title("No numeric data", y=1.0)
+            return
+
+        ax.set_xlim(grid.xlim)
+        ax.set_ylim(grid.ylim)
+        self.update()
+        self.callbacks = [
+            ax.callbacks.connect("xlim_changed", self.update),
+            ax.callbacks.connect("ylim_changed", self.update),
+        ]
+
+    def _cell_range(self, low, high, origin, step):
+        start = int(np.clip(math.floor((low - origin) / step), 0, GRID_SIZE - 1))
+        stop = int(np.clip(math.floor((high - origin) / step), 0, GRID_SIZE - 1))
+        return start, stop
+
+    def update(self, ax=None):
+        x0, x1 = sorted(self.ax.get_xlim())
+        y0, y1 = sorted(self.ax.get_ylim())
+        ix0, ix1 = self._cell_range(x0, x1, self.grid.xlim[0], self.grid.x_step)
+        iy0, iy1 = self._cell_range(y0, y1, self.grid.ylim[0], self.grid.y_step)
+        counts = self.grid.counts[ix0:ix1 + 1, iy0:iy1 + 1]
+
+        if counts.sum() <= RAW_POINT_LIMIT:
+            self._show_points(ix0, ix1, iy0, iy1, (x0, x1, y0, y1))
+        else:
+            self._show_density(counts, ix0, ix1, iy0, iy1)
+
+    def _show_points(self, ix0, ix1, iy0, iy1, limits):
+        rows = np.arange(ix0, ix1 + 1) * GRID_SIZE
+        starts = self.grid.cell_offsets[rows + iy0]
+        stops = self.grid.cell_offsets[rows + iy1 + 1]
+        if len(starts):
+            ids = np.concatenate([np.arange(start, stop) for start, stop in zip(starts, stops)])
+        else:
+            ids = np.empty(0, dtype=np.intp)
+        x, y = self.grid.x[ids], self.grid.y[ids]
+        x0, x1, y0, y1 = limits
+        inside = (x >= x0) & (x <= x1) & (y >= y0) & (y <= y1)
+        self.points.set_data(x[inside], y[inside])
+        self.points.set_visible(True)
+        self.image.set_visible(False)
+
+    def _show_density(self, counts, ix0, ix1, iy0, iy1):
+        factor = max(math.ceil(max(counts.shape) / DISPLAY_BINS), 1)
+        if factor > 1:
+            rows = math.ceil(counts.shape[0] / factor) * factor
+            cols = math.ceil(counts.shape[1] / factor) * factor
+            padded = np.zeros((rows, cols), dtype=counts.dtype)
+            padded[:counts.shape[0], :counts.shape[1]] = counts
+            counts = padded.reshape(rows // factor, factor, cols // factor, factor).sum(axis=(1, 3))
+        else:
+            rows, cols = counts.shape
+
+        density = np.ma.masked_equal(np.log1p(counts).T, 0)
+        self.image.set_data(density)
+        self.image.set_clim(0, max(float(density.max()), 1.0) if density.count() else 1.0)
+        self.image.set_extent((
+            self.grid.xlim[0] + ix0 * self.grid.x_step,
+            self.grid.xlim[0] + (ix0 + rows) * self.grid.x_step,
+            self.grid.ylim[0] + iy0 * self.grid.y_step,
+            self.grid.ylim[0] + (iy0 + cols) * self.grid.y_step,
+        ))
+        self.image.set_visible(True)
+        self.points.set_visible(False)
+
+    def disconnect(self):
+        self.crosshair.disconnect()
+
+
+class LevelOfDetailHistogram:
+    """Histogram of the visible value range computed from sorted values.
+
+    Takes the finite values already sorted (see sorted_finite). Bin counts
+    come from binary searches of the bin edges, so re-binning after a zoom
+    costs the same for a thousand values as for a million.
+    """
+
+    def __init__(self, ax, values, label):
+        self.ax = ax
+        self.values = values
+
+        _label_axes(ax, label, "Count", f"{label} distribution")
+        self.steps = ax.stairs(np.zeros(1), np.array([0.0, 1.0]), fill=True, alpha=0.7)
+        self.rug, = ax.plot([], [], linestyle="none", marker="|", color="0.2", visible=False)
+        self.crosshair = BlitCrosshair(ax, label, "Count")
+
+        if not len(self.values):
+            ax.set_title("No numeric data", y=1.0)
+            return
+
+        ax.set_xlim(_padded_limits(self.values))
+        self.update()
+        self.callbacks = [ax.callbacks.connect("xlim_changed", self.update)]
+
+    def update(self, ax=None):
+        x0, x1 = sorted(self.ax.get_xlim())
+        edges = np.linspace(x0, x1, HISTOGRAM_BINS + 1)
+        positions = np.searchsorted(self.values, edges, side="left")
+        positions[-1] = np.searchsorted(self.values, x1, side="right")
+        counts = np.diff(positions)
+        self.steps.set_data(counts, edges)
+
+        visible = positions[-1] - positions[0]
+        if visible <= RUG_POINT_LIMIT:
+            rug = self.values[positions[0]:positions[-1]]
+            self.rug.set_data(rug, np.zeros(len(rug)))
+            self.rug.set_visible(True)
+        else:
+            self.rug.set_visible(False)
+
+        self.ax.set_ylim(0, max(int(counts.max(initial=0)), 1) * 1.05)
+
+    def disconnect(self):
+        self.crosshair.disconnect()
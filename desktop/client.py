@@ -0,0 +1,240 @@
+import os
+import socket
+import threading
+import uuid
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+API_UPLOAD_URL = os.getenv("CHEM_EQUIP_API_URL", "http://localhost:8000/api/upload/")
+
+CONNECT_TIMEOUT = 10
+# Large files can take the server a while to parse once fully sent.
+READ_TIMEOUT = float(os.getenv("CHEM_EQUIP_READ_TIMEOUT", "300"))
+CHUNK_SIZE = 64 * 1024
+POOL_SIZE = 4
+
+
+class UploadError(Exception):
+    def __init__(self, message, status_code=None):
+        super().__init__(message)
+        # None means the request never got an HTTP response.
+        self.status_code = status_code
+
+
+class UploadCancelled(UploadError):
+    pass
+
+
+class CancelEvent(threading.Event):
+    """Cancellation flag that also aborts the request it was handed to.
+
+    The upload thread can block in the socket itself, either sending to a
+    server that stopped reading or waiting for the response, where ``read``
+    is never reached; setting the event shuts the socket down so either
+    ends at once.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._connection = None
+
+    def watch(self, connection):
+        self._connection = connection
+        if self.is_set():
+            self._abort()
+
+    def set(self):
+        super().set()
+        self._abort()
+
+    def _abort(self):
+        sock = getattr(self._connection, "sock", None)
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+
+class MultipartFileStream:
+    """File-like multipart/form-data body that reads the file lazily.
+
+    Having a length lets requests send a Content-Length header and stream the
+    body with ``read`` calls, which is where progress and cancellation hook in.
+    """
+
+    def __init__(self, file_path, field_name="file", fields=None,
+                 progress=None, cancel_event=None, chunk_size=CHUNK_SIZE):
+        self.boundary = uuid.uuid4().hex
+        self.content_type = f"multipart/form-data; boundary={self.boundary}"
+        self.progress = progress
+        self.cancel_event = cancel_event
+        self.chunk_size = chunk_size
+
+        preamble = b""
+        for name, value in (fields or {}).items():
+            preamble += (
+                f"--{self.boundary}\r\n"
+                f'Content-Disposition: form-data; name="{name}"\r\n\r\n'
+                f"{value}\r\n"
+            ).encode("utf-8")
+        filename = os.path.basename(file_path)
+        preamble += (
+            f"--{self.boundary}\r\n"
+            f'Content-Disposition: form-data; name="{field_name}"; filename="{filename}"\r\n'
+            "Content-Type: text/csv\r\n\r\n"
+        ).encode("utf-8")
+        self._parts = [preamble, None, f"\r\n--{self.boundary}--\r\n".encode("utf-8")]
+        self._file_path = file_path
+        self._file_size = os.path.getsize(file_path)
+        self._handle = None
+        self._buffer = b""
+        self.total = len(preamble) + self._file_size + len(self._parts[2])
+        self.sent = 0
+
+    def __len__(self):
+        return self.total
+
+    def _next_part(self):
+        while self._parts:
+            part = self._parts[0]
+            if part is not None:
+                self._parts.pop(0)
+                return part
+            if self._handle is None:
+                self._handle = open(self._file_path, "rb")
+            data = self._handle.read(self.chunk_size)
+            if data:
+                return data
+            self._handle.close()
+            self._parts.pop(0)
+        return b""
+
+    def read(self, size=-1):
+        if self.cancel_event is not None and self.cancel_event.is_set():
+            self.close()
+            raise UploadCancelled("Upload cancelled")
+
+        if size is None or size < 0:
+            size = self.total
+        while len(self._buffer) < size:
+            part = self._next_part()
+            if not part:
+                break
+            self._buffer += part
+        data, self._buffer = self._buffer[:size], self._buffer[size:]
+
+        self.sent += len(data)
+        if self.progress is not None and data:
+            self.progress(self.sent, self.total)
+        return data
+
+    def close(self):
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+
+
+class _UploadConnectionMixin:
+    cancel_event = None
+
+    def connect(self):
+        super().connect()
+        # A fresh connection is opened inside request(); hand its socket over
+        # before any of the body is sent.
+        if self.cancel_event is not None:
+            self.cancel_event.watch(self)
+
+    def request(self, method, url, body=None, headers=None, **kwargs):
+        if isinstance(body, MultipartFileStream) and isinstance(body.cancel_event, CancelEvent):
+            self.cancel_event = body.cancel_event
+            self.cancel_event.watch(self)
+        else:
+            self.cancel_event = None
+        super().request(method, url, body=body, headers=headers, **kwargs)
+
+
+class _UploadHTTPConnection(_UploadConnectionMixin, HTTPConnection):
+    pass
+
+
+class _UploadHTTPSConnection(_UploadConnectionMixin, HTTPSConnection):
+    pass
+
+
+class _UploadHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _UploadHTTPConnection
+
+
+class _UploadHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _UploadHTTPSConnection
+
+
+class UploadAdapter(HTTPAdapter):
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _UploadHTTPConnectionPool,
+            "https": _UploadHTTPSConnectionPool,
+        }
+
+
+def create_session(pool_size=POOL_SIZE):
+    # One pooled session per client keeps connections alive between uploads.
+    session = requests.Session()
+    adapter = UploadAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+class UploadClient:
+    def __init__(self, url=API_UPLOAD_URL, session=None, pool_size=POOL_SIZE):
+        self.url = url
+        self.session = session or create_session(pool_size)
+
+    def upload(self, file_path, progress=None, cancel_event=None, fields=None):
+        body = MultipartFileStream(
+            file_path,
+            fields=fields,
+            progress=progress,
+            cancel_event=cancel_event,
+        )
+        try:
+            response = self.session.post(
+                self.url,
+                data=body,
+                headers={"Content-Type": body.content_type},
+                timeout=(CONNECT_TIMEOUT, READ_TIMEOUT),
+            )
+        except UploadCancelled:
+            raise
+        except requests.RequestException as exc:
+            if cancel_event is not None and cancel_event.is_set():
+                raise UploadCancelled("Upload cancelled") from exc
+            raise UploadError(str(exc)) from exc
+        finally:
+            body.close()
+            if isinstance(cancel_event, CancelEvent):
+                # The connection goes back to the pool; a late cancel must
+                # not shut down a request that reuses it.
+                cancel_event.watch(None)
+
+        if response.status_code >= 400:
+            try:
+                payload = response.json()
+                error_message = payload.get("error", response.text)
+            except ValueError:
+                error_message = response.text
+            raise UploadError(error_message, status_code=response.status_code)
+
+        try:
+            return response.json()
+        except ValueError:
+            raise UploadError("invalid JSON response", status_code=response.status_code)
+
+    def close(self):
+        self.session.close()
@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import axios from 'axios';
 import { Upload, Download, BarChart3, FileSpreadsheet } from 'lucide-react';
 import {
@@ -32,12 +32,61 @@ function App() {
   const [error, setError] = useState(null);
   const [uploadSuccess, setUploadSuccess] = useState(false);
   const [history, setHistory] = useState([]);
+  const latestIdRef = useRef(null);
 
   useEffect(() => {
     fetchLatestData();
     fetchHistory();
   }, []);
 
+  useEffect(() => {
+    latestIdRef.current = data?.id ?? null;
+  }, [data]);
+
+  useEffect(() => {
+    // Upload events carry the history summary, so history is patched in place
+    // and the full dataset is only re-fetched when the latest upload changed.
+    const events = new EventSource(`${API_URL}/api/events/`);
+
+    events.addEventListener('upload.created', (event) => {
+      const upload = JSON.parse(event.data);
+      setHistory((current) =>
+        [upload, ...current.filter((item) => item.id !== upload.id)].slice(0, 5)
+      );
+      if (upload.id !== latestIdRef.current) {
+        fetchLatestData();
+      }
+    });
+
+    events.addEventListener('upload.updated', (event) => {
+      const upload = JSON.parse(event.data);
+      setHistory((current) =>
+        current.map((item) => (item.id === upload.id ? upload : item))
+      );
+      if (upload.id === latestIdRef.current) {
+        fetchLatestData();
+      }
+    });
+
+    events.addEventListener('upload.deleted', (event) => {
+      const { id } = JSON.parse(event.data);
+      setHistory((current) => current.filter((item) => item.id !== id));
+    });
+
+    // Events published while the stream was down are not replayed, so after
+    // a reconnect the dashboard catches up from the REST endpoints instead.
+    let connected = false;
+    events.addEventListener('open', () => {
+      if (connected) {
+        fetchHistory();
+        fetchLatestData();
+      }
+      connected = true;
+    });
+
+    return () => events.close();
+  }, []);
+
   const fetchLatestData = async () => {
     try {
       setLoading(true);
@@ -0,0 +1,18 @@
+import pytest
+
+
+@pytest.fixture(scope="module")
+def api(tmp_path_factory):
+    import django
+
+    django.setup()
+    from django.db import connection
+    from django.test import Client, override_settings
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+    with override_settings(MEDIA_ROOT=str(tmp_path_factory.mktemp("media"))):
+        yield Client()
+    connection.creation.destroy_test_db(old_name, verbosity=0)
+    teardown_test_environment()
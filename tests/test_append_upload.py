@@ -0,0 +1,145 @@
+import math
+import os
+import sys
+
+import pytest
+
+pytest.importorskip("rest_framework")
+pd = pytest.importorskip("pandas")
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "backend"))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+
+COLUMNS = ["Equipment Name", "Type", "Flowrate", "Pressure", "Temperature"]
+
+ORIGINAL = [
+    ["Pump-1", "Pump", 120.0, 5.2, 110.0],
+    ["Reactor-1", "Reactor", 150.5, 6.1, 130.0],
+    ["Valve-1", "Valve", 80.0, None, 95.0],
+]
+
+
+def csv_file(rows, name="equipment.csv", columns=COLUMNS):
+    from django.core.files.uploadedfile import SimpleUploadedFile
+
+    text = pd.DataFrame(rows, columns=columns).to_csv(index=False)
+    return SimpleUploadedFile(name, text.encode("utf-8"))
+
+
+def upload(api, rows, **fields):
+    return api.post("/api/upload/", {"file": csv_file(rows), **fields})
+
+
+def expected_stats(rows):
+    df = pd.DataFrame(rows, columns=COLUMNS)
+    return {
+        "total_equipment": len(df),
+        "average_flowrate": df["Flowrate"].mean(),
+        "average_pressure": df["Pressure"].mean(),
+        "average_temperature": df["Temperature"].mean(),
+        "equipment_distribution": df["Type"].value_counts().to_dict(),
+    }
+
+
+def assert_stats_match(stats, rows):
+    expected = expected_stats(rows)
+    assert stats["total_equipment"] == expected["total_equipment"]
+    assert stats["equipment_distribution"] == expected["equipment_distribution"]
+    for key in ("average_flowrate", "average_pressure", "average_temperature"):
+        assert math.isclose(stats[key], expected[key], rel_tol=1e-12)
+
+
+def test_append_upserts_and_updates_aggregates(api):
+    upload_id = upload(api, ORIGINAL).json()["id"]
+
+    first = [
+        ["Pump-1", "Pump", 200.0, 7.0, 140.0],
+        ["Compressor-1", "Compressor", 300.0, 9.5, None],
+    ]
+    response = upload(api, first, mode="append", upload_id=upload_id)
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["appended"], body["updated"]) == (1, 1)
+    merged = [first[0], ORIGINAL[1], ORIGINAL[2], first[1]]
+    assert_stats_match(body["stats"], merged)
+
+    # A second append moves a row to another type and removes nothing else.
+    second = [["Valve-1", "Pump", 90.0, 4.0, 100.0]]
+    body = upload(api, second, mode="append", upload_id=upload_id).json()
+    assert (body["appended"], body["updated"]) == (0, 1)
+    merged = [first[0], ORIGINAL[1], second[0], first[1]]
+    assert_stats_match(body["stats"], merged)
+
+    latest = api.get("/api/latest/").json()
+    assert latest["id"] == upload_id
+    assert sorted(row["Equipment Name"] for row in latest["data"]) == sorted(row[0] for row in merged)
+
+
+def test_append_replaces_cached_index(api):
+    from equipment.indexes import _cache
+
+    upload_id = upload(api, ORIGINAL).json()["id"]
+    api.get(f"/api/uploads/{upload_id}/query/")
+    for value in (1.0, 2.0, 3.0):
+        upload(api, [["Pump-1", "Pump", value, 1.0, 1.0]], mode="append", upload_id=upload_id)
+        api.get(f"/api/uploads/{upload_id}/query/")
+
+    assert [key for key in _cache if key[0] == upload_id] == [(upload_id, 3)]
+
+
+def test_append_rejects_extra_columns(api):
+    upload_id = upload(api, ORIGINAL).json()["id"]
+    extra = csv_file([row + ["North"] for row in ORIGINAL], columns=COLUMNS + ["Site"])
+    response = api.post("/api/upload/", {"file": extra, "mode": "append", "upload_id": upload_id})
+    assert response.status_code == 400
+    assert "Site" in response.json()["error"]
+
+    site_upload = api.post("/api/upload/", {"file": csv_file(
+        [row + ["North"] for row in ORIGINAL], columns=COLUMNS + ["Site"]
+    )}).json()
+    response = upload(api, ORIGINAL[:1], mode="append", upload_id=site_upload["id"])
+    assert response.status_code == 400
+    latest = api.get("/api/latest/").json()
+    assert latest["data"][0]["Site"] == "North"
+    assert latest["stats"]["total_equipment"] == len(ORIGINAL)
+
+
+def test_append_rejects_non_integer_upload_id(api):
+    upload(api, ORIGINAL)
+    response = upload(api, ORIGINAL[:1], mode="append", upload_id="abc")
+    assert response.status_code == 400
+    assert response.json()["error"] == "upload_id must be an integer"
+
+
+@pytest.mark.parametrize("name", [None, "", "   "])
+def test_append_rejects_missing_names(api, name):
+    upload_id = upload(api, ORIGINAL).json()["id"]
+    rows = [["Pump-9", "Pump", 1.0, 1.0, 1.0], [name, "Valve", 2.0, 2.0, 2.0]]
+
+    response = upload(api, rows, mode="append", upload_id=upload_id)
+
+    assert response.status_code == 400
+    assert response.json()["error"] == "Equipment Name is missing in row 2"
+    from equipment.models import EquipmentRecord
+
+    assert not EquipmentRecord.objects.filter(upload_id=upload_id).exists()
+
+
+def test_append_into_upload_with_missing_names_is_rejected(api):
+    upload_id = upload(api, ORIGINAL + [[None, "Pump", 1.0, 1.0, 1.0]]).json()["id"]
+
+    response = upload(api, ORIGINAL[:1], mode="append", upload_id=upload_id)
+
+    assert response.status_code == 400
+    assert response.json()["error"] == "Equipment Name is missing in row 4"
+
+
+def test_distribution_is_ordered_by_count_after_append(api):
+    upload_id = upload(api, ORIGINAL).json()["id"]
+    valves = [[f"Valve-{index}", "Valve", 1.0, 1.0, 1.0] for index in range(2, 5)]
+
+    body = upload(api, valves, mode="append", upload_id=upload_id).json()
+
+    assert list(body["stats"]["equipment_distribution"].items()) == [("Valve", 4), ("Pump", 1), ("Reactor", 1)]
+    latest = api.get("/api/latest/").json()
+    assert list(latest["stats"]["equipment_distribution"]) == ["Valve", "Pump", "Reactor"]
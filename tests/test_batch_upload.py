@@ -0,0 +1,233 @@
+import io
+import os
+import sys
+import zipfile
+
+import pytest
+
+pytest.importorskip("django")
+pytest.importorskip("rest_framework")
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "backend"))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+
+from django.core.files.uploadedfile import SimpleUploadedFile  # noqa: E402
+
+from equipment import batch  # noqa: E402
+
+CSV = b"Equipment Name,Type,Flowrate,Pressure,Temperature\nPump-1,Pump,1,2,3\n"
+# Twenty rows, large enough to be deflated.
+LONG_CSV = CSV + b"Pump-2,Pump,1,2,3\n" * 19
+UNSUPPORTED_METHOD = 99
+
+
+def zip_file(name, members):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as bundle:
+        for member, data in members.items():
+            bundle.writestr(member, data)
+    return SimpleUploadedFile(name, buffer.getvalue())
+
+
+def csv_upload(name, rows=1, header=b"Equipment Name,Type,Flowrate,Pressure,Temperature"):
+    lines = [header] + [f"{name}-{index},Pump,{index},2,3".encode("utf-8") for index in range(rows)]
+    return SimpleUploadedFile(name, b"\n".join(lines) + b"\n")
+
+
+def damaged_zip(name):
+    # good.csv, corrupt.csv whose deflated bytes are garbage, truncated.csv
+    # claiming to run past the end of the archive and unsupported.csv
+    # compressed with an unknown method.
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as bundle:
+        for member in ("good.csv", "corrupt.csv"):
+            bundle.writestr(member, LONG_CSV)
+        for member in ("truncated.csv", "unsupported.csv"):
+            bundle.writestr(zipfile.ZipInfo(member), CSV)
+    data = bytearray(buffer.getvalue())
+    with zipfile.ZipFile(io.BytesIO(bytes(data))) as bundle:
+        infos = {info.filename: info for info in bundle.infolist()}
+
+    def payload_start(info):
+        header = info.header_offset
+        return header + 30 + int.from_bytes(data[header + 26:header + 28], "little") + int.from_bytes(
+            data[header + 28:header + 30], "little"
+        )
+
+    corrupt = infos["corrupt.csv"]
+    start = payload_start(corrupt)
+    data[start:start + corrupt.compress_size] = b"\xff" * corrupt.compress_size
+    # Members are read as the central directory describes them.
+    directory = data.index(b"PK\x01\x02")
+    entry = data.index(b"truncated.csv", directory) - 46
+    data[entry + 20:entry + 28] = (2 * len(data)).to_bytes(4, "little") * 2
+    entry = data.index(b"unsupported.csv", directory) - 46
+    data[entry + 10:entry + 12] = UNSUPPORTED_METHOD.to_bytes(2, "little")
+    return SimpleUploadedFile(name, bytes(data))
+
+
+@pytest.fixture
+def member_reads(monkeypatch):
+    reads = []
+    read = zipfile.ZipFile.read
+
+    def counting_read(bundle, member, *args):
+        reads.append(member)
+        return read(bundle, member, *args)
+
+    monkeypatch.setattr(zipfile.ZipFile, "read", counting_read)
+    return reads
+
+
+def test_archives_expand_to_one_entry_per_member():
+    archive = zip_file("site.zip", {"a.csv": CSV, "b.csv": CSV, "notes.txt": b"x"})
+    entries = batch.expand_batch_files([SimpleUploadedFile("c.csv", CSV), archive])
+
+    assert [entry["file"] for entry in entries] == ["c.csv", "site.zip/a.csv", "site.zip/b.csv", "site.zip/notes.txt"]
+    assert entries[1]["data"] == CSV
+    assert entries[3]["error"] == "File must be a CSV"
+
+
+def test_file_limit_stops_expanding_archives(monkeypatch, member_reads):
+    monkeypatch.setattr(batch, "MAX_BATCH_FILES", 3)
+    archive = zip_file("site.zip", {f"{index}.csv": CSV for index in range(50)})
+
+    with pytest.raises(ValueError, match="at most 3 files"):
+        batch.expand_batch_files([SimpleUploadedFile("c.csv", CSV), archive])
+    assert len(member_reads) == 2
+
+
+def test_byte_limit_uses_uncompressed_member_sizes(monkeypatch, member_reads):
+    monkeypatch.setattr(batch, "MAX_BATCH_BYTES", 10 * len(CSV))
+    # Compresses to almost nothing but inflates past the cap.
+    archive = zip_file("bomb.zip", {"small.csv": CSV, "huge.csv": CSV + b"Pump-2,Pump,1,2,3\n" * 1000})
+    assert archive.size < 10 * len(CSV)
+
+    with pytest.raises(ValueError, match="MB of CSV data"):
+        batch.expand_batch_files([archive])
+    assert len(member_reads) == 1
+
+
+def test_byte_limit_counts_plain_files(monkeypatch):
+    monkeypatch.setattr(batch, "MAX_BATCH_BYTES", 2 * len(CSV))
+    files = [SimpleUploadedFile(f"{index}.csv", CSV) for index in range(3)]
+
+    with pytest.raises(ValueError, match="MB of CSV data"):
+        batch.expand_batch_files(files)
+    assert files[2].tell() == 0
+
+
+def test_damaged_members_only_fail_themselves():
+    entries = batch.expand_batch_files([damaged_zip("site.zip"), SimpleUploadedFile("c.csv", CSV)])
+
+    assert [entry["file"] for entry in entries] == [
+        "site.zip/good.csv", "site.zip/corrupt.csv", "site.zip/truncated.csv", "site.zip/unsupported.csv", "c.csv",
+    ]
+    assert entries[0]["data"] == LONG_CSV and entries[4]["data"] == CSV
+    for entry in entries[1:4]:
+        assert entry["error"].startswith("Could not extract file")
+        assert "data" not in entry
+
+
+@pytest.fixture
+def retention_calls(monkeypatch):
+    from equipment import views
+
+    calls = []
+    apply_retention = views.apply_retention
+
+    def counting_retention():
+        calls.append(1)
+        apply_retention()
+
+    monkeypatch.setattr(views, "apply_retention", counting_retention)
+    return calls
+
+
+def test_batch_endpoint_inserts_once_and_reports_in_order(api, retention_calls):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    files = [csv_upload(f"{index}.csv", rows=index + 1) for index in range(3)]
+    files.insert(1, damaged_zip("site.zip"))
+    files += [
+        SimpleUploadedFile("notes.txt", b"x"),
+        csv_upload("columns.csv", header=b"Equipment Name,Type,Flowrate"),
+        csv_upload("3.csv"),
+        csv_upload("4.csv"),
+        csv_upload("5.csv"),
+    ]
+    with CaptureQueriesContext(connection) as queries:
+        response = api.post("/api/upload/batch/", {"files": files})
+
+    assert response.status_code == 201
+    body = response.json()
+    results = body["results"]
+    assert [result["file"] for result in results] == [
+        "0.csv", "site.zip/good.csv", "site.zip/corrupt.csv", "site.zip/truncated.csv", "site.zip/unsupported.csv",
+        "1.csv", "2.csv", "notes.txt", "columns.csv", "3.csv", "4.csv", "5.csv",
+    ]
+    failed = {result["file"]: result["error"] for result in results if "error" in result}
+    assert list(failed) == [
+        "site.zip/corrupt.csv", "site.zip/truncated.csv", "site.zip/unsupported.csv", "notes.txt", "columns.csv",
+    ]
+    assert failed["notes.txt"] == "File must be a CSV"
+    assert failed["site.zip/truncated.csv"] == "Could not extract file: archive is truncated"
+    assert "Missing required columns" in failed["columns.csv"]
+    assert body["created"] == 7 and body["failed"] == 5
+
+    inserts = [query for query in queries.captured_queries if query["sql"].startswith('INSERT INTO "equipment_equipmentupload"')]
+    assert len(inserts) == 1
+    assert len(retention_calls) == 1
+
+    # Retention keeps the five newest uploads: the last five of this batch.
+    created = [result for result in results if "id" in result]
+    assert [result["retained"] for result in created] == [False, False, True, True, True, True, True]
+    assert [result["stats"]["total_equipment"] for result in created] == [1, 20, 2, 3, 1, 1, 1]
+    from equipment.models import EquipmentUpload
+
+    assert sorted(EquipmentUpload.objects.values_list("pk", flat=True)) == [result["id"] for result in created[2:]]
+
+
+@pytest.fixture
+def parse_pool(monkeypatch):
+    monkeypatch.setattr(batch, "BATCH_PARSE_WORKERS", 2)
+    yield
+    if batch._pool is not None:
+        batch._pool.shutdown()
+        batch._pool = None
+
+
+def test_batch_endpoint_parses_across_the_process_pool(api, parse_pool):
+    files = [csv_upload(f"pool-{index}.csv", rows=index + 1) for index in range(3)]
+    files.append(csv_upload("columns.csv", header=b"Equipment Name,Type,Flowrate"))
+
+    response = api.post("/api/upload/batch/", {"files": files})
+
+    assert batch._pool is not None
+    results = response.json()["results"]
+    assert [result["stats"]["total_equipment"] for result in results[:3]] == [1, 2, 3]
+    assert [result["stats"]["average_flowrate"] for result in results[:3]] == [0.0, 0.5, 1.0]
+    assert "Missing required columns" in results[3]["error"]
+
+
+def test_batch_announces_only_retained_uploads_after_retention(api):
+    import json
+
+    from equipment.events import ThreadSubscriber, broker
+
+    subscriber = broker.subscribe(ThreadSubscriber())
+    try:
+        files = [csv_upload(f"announce-{index}.csv") for index in range(7)]
+        results = api.post("/api/upload/batch/", {"files": files}).json()["results"]
+    finally:
+        broker.unsubscribe(subscriber)
+
+    events = []
+    while (message := subscriber.get(0)) is not None:
+        event_type, data = message.splitlines()[:2]
+        events.append((event_type.removeprefix("event: "), json.loads(data.removeprefix("data: "))["id"]))
+    created = [upload_id for event_type, upload_id in events if event_type == "upload.created"]
+    assert created == [result["id"] for result in results if result["retained"]]
+    assert len(created) == 5
+    # Retention's deletions all come before the announcements.
+    assert [event_type for event_type, _ in events] == ["upload.deleted"] * (len(events) - 5) + ["upload.created"] * 5
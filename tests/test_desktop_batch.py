@@ -0,0 +1,179 @@
+import json
+import os
+import re
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+pytest.importorskip("requests")
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "desktop"))
+
+import batch  # noqa: E402
+from client import UploadClient  # noqa: E402
+
+# Keeps retries in the tests to a few milliseconds of backoff.
+TEST_BACKOFF = 0.001
+
+
+class FlakyUploadHandler(BaseHTTPRequestHandler):
+    # Fails each file's first ``failures[name]`` attempts with a 503 and
+    # rejects names starting with "bad" outright.
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        name = re.search(rb'filename="([^"]+)"', body).group(1).decode("utf-8")
+        server = self.server
+        with server.lock:
+            server.attempts[name] = server.attempts.get(name, 0) + 1
+            attempt = server.attempts[name]
+            server.upload_count += 1
+            upload_id = server.upload_count
+
+        if name.startswith("bad"):
+            self.respond(400, {"error": "Missing required columns"})
+        elif attempt <= server.failures.get(name, 0):
+            self.respond(503, {"error": "Service unavailable"})
+        else:
+            self.respond(201, {"id": upload_id})
+
+    def respond(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FlakyUploadHandler)
+    server.lock = threading.Lock()
+    server.attempts = {}
+    server.failures = {}
+    server.upload_count = 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    server.url = f"http://127.0.0.1:{server.server_address[1]}/api/upload/"
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def write_csv(directory, name, rows=1):
+    path = directory / name
+    lines = ["Equipment Name,Type,Flowrate,Pressure,Temperature"]
+    lines += [f"{name}-{index},Pump,1.0,2.0,3.0" for index in range(rows)]
+    path.write_text("\n".join(lines) + "\n")
+    return path
+
+
+def statuses(report):
+    return {os.path.basename(result["file"]): result["status"] for result in report["results"]}
+
+
+def test_transient_failures_are_retried(stub_server, tmp_path):
+    write_csv(tmp_path, "a.csv")
+    write_csv(tmp_path, "b.csv", rows=2)
+    stub_server.failures = {"a.csv": 2}
+
+    report = batch.run_batch(str(tmp_path), url=stub_server.url, retries=3, backoff_base=TEST_BACKOFF)
+
+    assert report["uploaded"] == 2 and report["failed"] == 0
+    attempts = {os.path.basename(result["file"]): result["attempts"] for result in report["results"]}
+    assert attempts == {"a.csv": 3, "b.csv": 1}
+    assert stub_server.attempts == {"a.csv": 3, "b.csv": 1}
+
+
+def test_retries_stop_at_limit_and_on_client_errors(stub_server, tmp_path):
+    write_csv(tmp_path, "down.csv")
+    write_csv(tmp_path, "bad.csv")
+    stub_server.failures = {"down.csv": 10}
+
+    report = batch.run_batch(str(tmp_path), url=stub_server.url, retries=2, backoff_base=TEST_BACKOFF)
+
+    assert report["failed"] == 2
+    failures = {os.path.basename(failure["file"]): failure for failure in report["failures"]}
+    assert failures["down.csv"]["attempts"] == 3
+    assert failures["bad.csv"]["attempts"] == 1
+    assert failures["bad.csv"]["error"] == "Missing required columns"
+    assert stub_server.attempts == {"down.csv": 3, "bad.csv": 1}
+
+
+def test_backoff_grows_exponentially_and_is_capped(stub_server, tmp_path, monkeypatch):
+    path = write_csv(tmp_path, "a.csv")
+    stub_server.failures = {"a.csv": 6}
+    monkeypatch.setattr(batch.random, "uniform", lambda low, high: 0.0)
+    delays = []
+
+    client = UploadClient(url=stub_server.url)
+    data, attempts = batch.upload_with_retry(
+        client, str(path), retries=6, backoff_base=10.0, sleep=delays.append
+    )
+    client.close()
+
+    assert attempts == 7 and data["id"] == 7
+    assert delays == [10.0, 20.0, batch.BACKOFF_MAX, batch.BACKOFF_MAX, batch.BACKOFF_MAX, batch.BACKOFF_MAX]
+
+
+def test_backoff_jitter_stays_within_half_the_delay(stub_server, tmp_path):
+    path = write_csv(tmp_path, "a.csv")
+    stub_server.failures = {"a.csv": 3}
+    delays = []
+
+    client = UploadClient(url=stub_server.url)
+    batch.upload_with_retry(client, str(path), retries=3, backoff_base=1.0, sleep=delays.append)
+    client.close()
+
+    for attempt, delay in enumerate(delays):
+        assert 2 ** attempt <= delay <= 1.5 * 2 ** attempt
+
+
+def test_cached_and_duplicate_files_are_skipped(stub_server, tmp_path):
+    write_csv(tmp_path, "a.csv")
+    write_csv(tmp_path, "b.csv", rows=2)
+    # Same content as a.csv under another name.
+    (tmp_path / "copy.csv").write_bytes((tmp_path / "a.csv").read_bytes())
+
+    first = batch.run_batch(str(tmp_path), url=stub_server.url, backoff_base=TEST_BACKOFF)
+    assert first["uploaded"] == 2 and first["skipped"] == 1
+    assert statuses(first)["copy.csv"] == "skipped"
+
+    with open(tmp_path / batch.CACHE_FILENAME, encoding="utf-8") as handle:
+        assert len(json.load(handle)) == 2
+
+    write_csv(tmp_path, "c.csv", rows=3)
+    second = batch.run_batch(str(tmp_path), url=stub_server.url, backoff_base=TEST_BACKOFF)
+    assert statuses(second) == {"a.csv": "skipped", "b.csv": "skipped", "c.csv": "uploaded", "copy.csv": "skipped"}
+    assert stub_server.upload_count == 3
+
+
+def test_unreadable_files_are_reported_as_failures(stub_server, tmp_path, monkeypatch):
+    write_csv(tmp_path, "a.csv")
+    write_csv(tmp_path, "locked.csv")
+    write_csv(tmp_path, "vanishing.csv", rows=2)
+    file_digest = batch.file_digest
+
+    def flaky_digest(file_path):
+        name = os.path.basename(file_path)
+        if name == "locked.csv":
+            raise PermissionError(13, "Permission denied", file_path)
+        digest = file_digest(file_path)
+        if name == "vanishing.csv":
+            # Gone by the time it is uploaded.
+            os.remove(file_path)
+        return digest
+
+    monkeypatch.setattr(batch, "file_digest", flaky_digest)
+    report = batch.run_batch(str(tmp_path), url=stub_server.url, backoff_base=TEST_BACKOFF)
+
+    assert statuses(report) == {"a.csv": "uploaded", "locked.csv": "failed", "vanishing.csv": "failed"}
+    failures = {os.path.basename(failure["file"]): failure for failure in report["failures"]}
+    assert "Permission denied" in failures["locked.csv"]["error"]
+    assert "No such file" in failures["vanishing.csv"]["error"]
+    assert failures["vanishing.csv"]["attempts"] == 1
+    assert stub_server.attempts == {"a.csv": 1}
@@ -0,0 +1,94 @@
+import os
+import sys
+
+import pytest
+
+np = pytest.importorskip("numpy")
+matplotlib = pytest.importorskip("matplotlib")
+matplotlib.use("Agg")
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "desktop"))
+
+from matplotlib.backends.backend_agg import FigureCanvasAgg  # noqa: E402
+from matplotlib.figure import Figure  # noqa: E402
+
+import charts  # noqa: E402
+from charts import DensityScatter, LevelOfDetailHistogram, ScatterGrid, sorted_finite  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def points():
+    rng = np.random.default_rng(3)
+    x = rng.lognormal(5, 0.4, 50000)
+    y = x * 0.02 + rng.normal(5, 1, 50000)
+    y[rng.random(50000) < 0.05] = np.nan
+    x[:10] = np.inf
+    return x, y
+
+
+@pytest.fixture
+def ax():
+    figure = Figure(figsize=(5, 4))
+    FigureCanvasAgg(figure)
+    return figure.add_subplot(111)
+
+
+def test_grid_keeps_every_finite_point_in_its_cell(points):
+    x, y = points
+    grid = ScatterGrid(x, y)
+    finite = np.isfinite(x) & np.isfinite(y)
+
+    assert grid.size == finite.sum() == grid.counts.sum()
+    cell = 1234
+    ids = slice(grid.cell_offsets[cell], grid.cell_offsets[cell + 1])
+    ix, iy = divmod(cell, charts.GRID_SIZE)
+    assert ((grid.x[ids] - grid.xlim[0]) // grid.x_step == ix).all()
+    assert ((grid.y[ids] - grid.ylim[0]) // grid.y_step == iy).all()
+
+
+def test_full_view_shows_the_density_of_every_point(points, ax):
+    scatter = DensityScatter(ax, ScatterGrid(*points), "Flowrate", "Pressure")
+
+    assert scatter.image.get_visible() and not scatter.points.get_visible()
+    density = scatter.image.get_array()
+    assert np.expm1(density.filled(0)).round().sum() == scatter.size
+    assert max(density.shape) <= charts.DISPLAY_BINS
+
+
+def test_zoomed_view_shows_exactly_the_points_inside(points, ax):
+    x, y = points
+    scatter = DensityScatter(ax, ScatterGrid(x, y), "Flowrate", "Pressure")
+    ax.set_xlim(150, 160)
+    ax.set_ylim(7.5, 8.0)
+
+    inside = (x >= 150) & (x <= 160) & (y >= 7.5) & (y <= 8.0)
+    assert scatter.points.get_visible() and not scatter.image.get_visible()
+    shown = sorted(zip(*scatter.points.get_data()))
+    assert shown == sorted(zip(x[inside], y[inside]))
+
+
+def test_scatter_without_finite_points(ax):
+    scatter = DensityScatter(ax, ScatterGrid(np.array([np.nan]), np.array([1.0])), "Flowrate", "Pressure")
+
+    assert scatter.size == 0 and ax.get_title() == "No numeric data"
+
+
+def test_histogram_bins_match_numpy(points, ax):
+    x, _ = points
+    histogram = LevelOfDetailHistogram(ax, sorted_finite(x), "Flowrate")
+    ax.set_xlim(140, 170)
+
+    counts, edges = np.histogram(x[np.isfinite(x)], bins=charts.HISTOGRAM_BINS, range=(140, 170))
+    steps = histogram.steps.get_data()
+    np.testing.assert_allclose(steps.edges, edges)
+    np.testing.assert_array_equal(steps.values, counts)
+    assert not histogram.rug.get_visible()
+
+
+def test_histogram_marks_values_when_few_are_visible(points, ax):
+    values = sorted_finite(points[0])
+    histogram = LevelOfDetailHistogram(ax, values, "Flowrate")
+    ax.set_xlim(149.0, 149.5)
+
+    rug, _ = histogram.rug.get_data()
+    assert histogram.rug.get_visible()
+    np.testing.assert_array_equal(rug, values[(values >= 149.0) & (values <= 149.5)])
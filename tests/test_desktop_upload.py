@@ -0,0 +1,293 @@
+import json
+import os
+import socket
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+pytest.importorskip("requests")
+pytest.importorskip("matplotlib")
+QtCore = pytest.importorskip("PyQt5.QtCore")
+QtWidgets = pytest.importorskip("PyQt5.QtWidgets")
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "desktop"))
+
+from app import DesktopApp  # noqa: E402
+from client import UploadClient  # noqa: E402
+
+UPLOAD_SIZE = 4 * 1024 * 1024
+READ_CHUNK = 64 * 1024
+# Per-chunk delay in the stub server: ~64 chunks -> roughly 2 s per upload.
+READ_DELAY = 0.03
+# Longest acceptable gap between GUI timer ticks while uploading.
+MAX_EVENT_GAP = 0.25
+# How long the slow-response stub sits on a fully received upload.
+RESPONSE_DELAY = 8
+STALLED_UPLOAD_SIZE = 64 * 1024 * 1024
+# Time for the client to fill the socket buffers of a stalled server.
+STALL_SETTLE_MS = 1500
+
+STUB_RESPONSE = {
+    "id": 1,
+    "stats": {
+        "total_equipment": 3,
+        "average_flowrate": 1.0,
+        "average_pressure": 2.0,
+        "average_temperature": 3.0,
+        "equipment_distribution": {"Pump": 2, "Reactor": 1},
+    },
+}
+
+
+class SlowUploadHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        remaining = int(self.headers.get("Content-Length", 0))
+        try:
+            while remaining:
+                chunk = self.rfile.read(min(READ_CHUNK, remaining))
+                if not chunk:
+                    return
+                remaining -= len(chunk)
+                time.sleep(READ_DELAY)
+        except OSError:
+            return
+
+        body = json.dumps(STUB_RESPONSE).encode("utf-8")
+        self.send_response(201)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class SlowResponseHandler(BaseHTTPRequestHandler):
+    # Takes the whole body at once, then keeps the client waiting.
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        time.sleep(RESPONSE_DELAY)
+        try:
+            self.send_response(201)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+        except OSError:
+            pass
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(handler):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/api/upload/"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def stalled_server():
+    # Accepts connections but never reads from them, so once the socket
+    # buffers fill the client is blocked inside send.
+    listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    listener.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+    listener.bind(("127.0.0.1", 0))
+    listener.listen()
+    accepted = []
+
+    def accept():
+        while True:
+            try:
+                accepted.append(listener.accept()[0])
+            except OSError:
+                return
+
+    threading.Thread(target=accept, daemon=True).start()
+    yield f"http://127.0.0.1:{listener.getsockname()[1]}/api/upload/"
+    listener.close()
+    for connection in accepted:
+        connection.close()
+
+
+@pytest.fixture
+def stub_server():
+    yield from serve(SlowUploadHandler)
+
+
+@pytest.fixture
+def slow_response_server():
+    yield from serve(SlowResponseHandler)
+
+
+@pytest.fixture
+def qt_app():
+    return QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+
+
+@pytest.fixture
+def huge_csv(tmp_path):
+    # Larger than the socket buffers on both ends combined.
+    path = tmp_path / "huge.csv"
+    with open(path, "wb") as handle:
+        handle.write(b"Equipment Name,Type,Flowrate,Pressure,Temperature\n")
+        handle.write(b"Pump-1,Pump,120.0,45.0,300.0\n" * (STALLED_UPLOAD_SIZE // 29))
+    return str(path)
+
+
+@pytest.fixture
+def large_csv(tmp_path):
+    path = tmp_path / "large.csv"
+    row = b"Pump-1,Pump,120.0,45.0,300.0\n"
+    with open(path, "wb") as handle:
+        handle.write(b"Equipment Name,Type,Flowrate,Pressure,Temperature\n")
+        handle.write(row * (UPLOAD_SIZE // len(row)))
+    return str(path)
+
+
+def run_upload(window, file_path, on_progress=None, timeout_ms=30000):
+    ticks = []
+    progress = []
+    timer = QtCore.QTimer()
+    timer.timeout.connect(lambda: ticks.append(time.perf_counter()))
+    timer.start(10)
+
+    loop = QtCore.QEventLoop()
+    window.start_upload(file_path)
+    window.upload_worker.progress.connect(lambda sent, total: progress.append(sent))
+    if on_progress is not None:
+        window.upload_worker.progress.connect(on_progress)
+    window.upload_thread.finished.connect(loop.quit)
+    QtCore.QTimer.singleShot(timeout_ms, loop.quit)
+    loop.exec_()
+    # Let the queued finished handlers run.
+    QtWidgets.QApplication.processEvents()
+    timer.stop()
+
+    gaps = [later - earlier for earlier, later in zip(ticks, ticks[1:])]
+    return progress, max(gaps, default=0.0), len(ticks)
+
+
+def test_gui_stays_responsive_during_large_upload(qt_app, stub_server, large_csv):
+    window = DesktopApp(client=UploadClient(url=stub_server))
+    progress, max_gap, tick_count = run_upload(window, large_csv)
+
+    assert window.upload_thread is None
+    assert window.label.text().startswith("Upload successful")
+    assert window.progress_bar.value() == 100
+    assert window.button.isEnabled()
+    assert progress == sorted(progress)
+    assert progress[-1] > UPLOAD_SIZE
+    assert tick_count > 50
+    assert max_gap < MAX_EVENT_GAP
+    window.close()
+
+
+def test_upload_can_be_cancelled(qt_app, stub_server, large_csv):
+    window = DesktopApp(client=UploadClient(url=stub_server))
+
+    def cancel_early(sent, total):
+        if sent > total // 4 and window.cancel_button.isEnabled():
+            window.cancel_upload()
+
+    progress, max_gap, _ = run_upload(window, large_csv, on_progress=cancel_early)
+
+    assert window.upload_thread is None
+    assert window.label.text() == "Upload cancelled"
+    assert progress[-1] < UPLOAD_SIZE
+    assert window.button.isEnabled()
+    assert max_gap < MAX_EVENT_GAP
+    window.close()
+
+
+def test_session_is_reused_across_uploads(qt_app, stub_server, large_csv):
+    client = UploadClient(url=stub_server)
+    window = DesktopApp(client=client)
+    session = client.session
+    run_upload(window, large_csv)
+    run_upload(window, large_csv)
+
+    assert client.session is session
+    assert window.label.text().startswith("Upload successful")
+    window.close()
+
+
+def cancel_after_body_sent(window):
+    # Cancel only once the whole body is sent and the worker is blocked
+    # waiting for the server to answer.
+    def cancel_when_sent(sent, total):
+        if sent == total:
+            QtCore.QTimer.singleShot(300, window.cancel_upload)
+    return cancel_when_sent
+
+
+def test_cancel_aborts_response_wait(qt_app, slow_response_server, large_csv):
+    window = DesktopApp(client=UploadClient(url=slow_response_server))
+
+    started = time.perf_counter()
+    progress, max_gap, _ = run_upload(window, large_csv, on_progress=cancel_after_body_sent(window))
+    elapsed = time.perf_counter() - started
+
+    assert progress[-1] > UPLOAD_SIZE
+    assert window.upload_thread is None
+    assert window.label.text() == "Upload cancelled"
+    assert elapsed < RESPONSE_DELAY / 2
+    assert max_gap < MAX_EVENT_GAP
+    window.close()
+
+
+def test_close_during_response_wait_is_bounded(qt_app, slow_response_server, large_csv):
+    window = DesktopApp(client=UploadClient(url=slow_response_server))
+    # closeEvent is only delivered to a shown window.
+    window.show()
+    window.start_upload(large_csv)
+    body_sent = QtCore.QEventLoop()
+    window.upload_worker.progress.connect(lambda done, total: done == total and body_sent.quit())
+    QtCore.QTimer.singleShot(10000, body_sent.quit)
+    body_sent.exec_()
+
+    started = time.perf_counter()
+    window.close()
+    assert time.perf_counter() - started < RESPONSE_DELAY / 2
+    QtWidgets.QApplication.processEvents()
+    assert window.upload_thread is None
+
+
+def test_cancel_aborts_send_to_stalled_server(qt_app, stalled_server, huge_csv):
+    window = DesktopApp(client=UploadClient(url=stalled_server))
+    started = []
+
+    def cancel_once_stalled(sent, total):
+        if not started:
+            started.append(time.perf_counter())
+            QtCore.QTimer.singleShot(STALL_SETTLE_MS, window.cancel_upload)
+
+    progress, max_gap, _ = run_upload(window, huge_csv, on_progress=cancel_once_stalled, timeout_ms=15000)
+
+    assert window.upload_thread is None
+    assert window.label.text() == "Upload cancelled"
+    assert progress[-1] < STALLED_UPLOAD_SIZE
+    assert time.perf_counter() - started[0] < STALL_SETTLE_MS / 1000 + 2
+    assert max_gap < MAX_EVENT_GAP
+    window.close()
+
+
+def test_close_while_stalled_waits_for_worker(qt_app, stalled_server, huge_csv):
+    window = DesktopApp(client=UploadClient(url=stalled_server))
+    window.show()
+    window.start_upload(huge_csv)
+    thread = window.upload_thread
+    stalled = QtCore.QEventLoop()
+    QtCore.QTimer.singleShot(STALL_SETTLE_MS, stalled.quit)
+    stalled.exec_()
+
+    started = time.perf_counter()
+    window.close()
+    assert time.perf_counter() - started < 2
+    assert thread.isFinished()
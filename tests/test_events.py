@@ -0,0 +1,150 @@
+import asyncio
+import json
+import multiprocessing
+import os
+import queue
+import socket
+import sys
+
+import pytest
+
+pytest.importorskip("django")
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "backend"))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+
+from equipment import events  # noqa: E402
+from equipment.events import EventBroker, EventRelay, ThreadSubscriber, _offer  # noqa: E402
+
+RELAY_TIMEOUT = 10
+
+
+def parse(message):
+    event_type, data = message.splitlines()[:2]
+    return event_type.removeprefix("event: "), json.loads(data.removeprefix("data: "))
+
+
+def test_broker_fans_out_to_every_subscriber():
+    broker = EventBroker()
+    first = broker.subscribe(ThreadSubscriber())
+    second = broker.subscribe(ThreadSubscriber())
+    assert broker.subscriber_count == 2
+
+    broker.publish("upload.created", {"id": 1})
+    assert parse(first.get(0)) == parse(second.get(0)) == ("upload.created", {"id": 1})
+
+    broker.unsubscribe(first)
+    broker.publish("upload.deleted", {"id": 1})
+    assert first.get(0) is None
+    assert parse(second.get(0)) == ("upload.deleted", {"id": 1})
+    assert broker.subscriber_count == 1
+
+
+def test_offer_drops_the_oldest_events_when_full():
+    buffer = queue.Queue(maxsize=3)
+    for message in range(5):
+        _offer(buffer, message)
+
+    assert [buffer.get_nowait() for _ in range(3)] == [2, 3, 4]
+
+
+def test_async_subscriber_drops_the_oldest_events(monkeypatch):
+    monkeypatch.setattr(events, "SUBSCRIBER_BUFFER", 2)
+
+    async def run():
+        subscriber = events.AsyncSubscriber()
+        for message in ("a", "b", "c"):
+            subscriber.deliver(message)
+        await asyncio.sleep(0)
+        return [await subscriber.get(0.1) for _ in range(3)]
+
+    assert asyncio.run(run()) == ["b", "c", None]
+
+
+def relay_publisher(directory, ready, go):
+    # Runs in another process: joins the relay and publishes on request.
+    broker = EventBroker()
+    broker.join_relay(directory)
+    ready.set()
+    go.wait(RELAY_TIMEOUT)
+    broker.publish("upload.created", {"id": os.getpid()})
+    broker.leave_relay()
+
+
+@pytest.fixture
+def relay_directory(tmp_path_factory):
+    # Unix socket paths are short; keep them well under the limit.
+    directory = tmp_path_factory.mktemp("relay")
+    if len(str(directory)) > 80:
+        pytest.skip("temporary directory path too long for Unix sockets")
+    return str(directory)
+
+
+def test_relay_delivers_events_between_processes(relay_directory):
+    broker = EventBroker()
+    broker.join_relay(relay_directory)
+    subscriber = broker.subscribe(ThreadSubscriber())
+    context = multiprocessing.get_context("spawn")
+    ready, go = context.Event(), context.Event()
+    process = context.Process(target=relay_publisher, args=(relay_directory, ready, go))
+    process.start()
+    try:
+        assert ready.wait(RELAY_TIMEOUT)
+        go.set()
+        message = subscriber.get(RELAY_TIMEOUT)
+    finally:
+        process.join(RELAY_TIMEOUT)
+        broker.leave_relay()
+
+    assert parse(message) == ("upload.created", {"id": process.pid})
+    assert os.listdir(relay_directory) == []
+
+
+def test_relay_skips_itself_and_removes_dead_sockets(relay_directory):
+    received = []
+    relay = EventRelay(relay_directory, received.append)
+    # Left behind by a worker that exited without cleaning up.
+    dead = os.path.join(relay_directory, "dead.sock")
+    stale = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+    stale.bind(dead)
+    stale.close()
+    try:
+        relay.send("event: upload.created\ndata: {}\n\n")
+    finally:
+        relay.close()
+
+    assert received == []
+    assert os.listdir(relay_directory) == []
+
+
+def test_sse_application_unsubscribes_on_disconnect(monkeypatch):
+    broker = EventBroker()
+    monkeypatch.setattr(events, "broker", broker)
+
+    async def run():
+        sent = []
+        inbox = asyncio.Queue()
+
+        async def send(message):
+            sent.append(message)
+
+        application = asyncio.ensure_future(events.sse_application({"type": "http"}, inbox.get, send))
+        while broker.subscriber_count == 0:
+            await asyncio.sleep(0.01)
+        broker.publish("upload.created", {"id": 7})
+        while len(sent) < 3:
+            await asyncio.sleep(0.01)
+        subscribed = broker.subscriber_count
+
+        await inbox.put({"type": "http.disconnect"})
+        await asyncio.wait_for(application, RELAY_TIMEOUT)
+        # Let the cancelled stream run its cleanup.
+        for _ in range(10):
+            await asyncio.sleep(0)
+        return sent, subscribed
+
+    sent, subscribed = asyncio.run(run())
+
+    assert subscribed == 1 and broker.subscriber_count == 0
+    assert sent[0]["type"] == "http.response.start" and sent[0]["status"] == 200
+    assert sent[1]["body"].startswith(b"retry: ")
+    assert parse(sent[2]["body"].decode("utf-8")) == ("upload.created", {"id": 7})
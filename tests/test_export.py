@@ -0,0 +1,128 @@
+import csv
+import io
+import os
+import sys
+import zlib
+
+import pytest
+
+pytest.importorskip("rest_framework")
+pd = pytest.importorskip("pandas")
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "backend"))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+
+COLUMNS = ["Equipment Name", "Type", "Flowrate", "Pressure", "Temperature"]
+TYPES = ["Pump", "Reactor", "Valve", "Compressor"]
+
+
+def equipment_rows(count):
+    rows = []
+    for index in range(count):
+        pressure = None if index % 7 == 0 else round(4 + (index % 13) * 0.1, 1)
+        rows.append([f"Unit-{index}", TYPES[index % len(TYPES)], float(index % 50), pressure, 90.0 + index % 17])
+    return rows
+
+
+@pytest.fixture(scope="module")
+def upload_id(api):
+    from django.core.files.uploadedfile import SimpleUploadedFile
+
+    text = pd.DataFrame(equipment_rows(300), columns=COLUMNS).to_csv(index=False)
+    response = api.post("/api/upload/", {"file": SimpleUploadedFile("export.csv", text.encode("utf-8"))})
+    return response.json()["id"]
+
+
+@pytest.fixture
+def dataset():
+    from equipment.dataset import EquipmentDataset
+
+    return EquipmentDataset(pd.DataFrame(equipment_rows(300), columns=COLUMNS))
+
+
+def cached_keys(upload_id):
+    from equipment import indexes
+
+    return [key for key in indexes._cache if key[0] == upload_id]
+
+
+def discard_index(upload_id):
+    from equipment.indexes import discard_dataset_indexes
+
+    discard_dataset_indexes(upload_id)
+
+
+def test_csv_export_sends_the_header_first_then_row_chunks(dataset):
+    from equipment.exports import iter_csv
+
+    chunks = list(iter_csv(dataset, list(range(300)), chunk_size=40))
+
+    assert chunks[0] == ",".join(COLUMNS) + "\n"
+    assert [chunk.count("\n") for chunk in chunks[1:]] == [40] * 7 + [20]
+    assert chunks[1].startswith("Unit-0,Pump,0.0,,90.0\n")
+
+
+def test_export_endpoint_streams_the_header_on_its_own(api, upload_id):
+    chunks = list(api.get(f"/api/uploads/{upload_id}/export/csv/").streaming_content)
+
+    assert chunks[0] == (",".join(COLUMNS) + "\n").encode("utf-8")
+    assert b"".join(chunks[1:]).count(b"\n") == 300
+
+
+def test_gzip_output_decompresses_chunk_by_chunk(dataset):
+    from equipment.exports import iter_csv, iter_gzip
+
+    plain = [chunk.encode("utf-8") for chunk in iter_csv(dataset, list(range(300)), chunk_size=40)]
+    compressed = list(iter_gzip(iter(plain)))
+
+    decompressor = zlib.decompressobj(31)
+    # Each chunk's sync flush makes exactly its CSV chunk readable on arrival.
+    for chunk, expected in zip(compressed, plain):
+        assert decompressor.decompress(chunk) == expected
+    assert len(compressed) == len(plain) + 1
+    assert decompressor.decompress(compressed[-1]) + decompressor.flush() == b""
+    assert decompressor.eof
+
+
+def test_gzip_export_matches_plain_export(api, upload_id):
+    plain = b"".join(api.get(f"/api/uploads/{upload_id}/export/csv/?sort=flowrate").streaming_content)
+    response = api.get(f"/api/uploads/{upload_id}/export/csv/?sort=flowrate&gzip=1")
+
+    assert response["Content-Type"] == "application/gzip"
+    assert 'filename="equipment_upload_' in response["Content-Disposition"]
+    assert zlib.decompress(b"".join(response.streaming_content), 31) == plain
+
+
+@pytest.mark.parametrize("params", [
+    "",
+    "type=Pump,Valve",
+    "pressure_min=4.5&pressure_max=5.0",
+    "pressure_min=5.2&pressure_max=5.2",
+    "sort=-pressure",
+    "type=Reactor&flowrate_min=10&sort=temperature",
+    "type=Unknown",
+])
+def test_export_matches_query_endpoint(api, upload_id, params):
+    query = api.get(f"/api/uploads/{upload_id}/query/?limit=1000&{params}").json()
+    content = b"".join(api.get(f"/api/uploads/{upload_id}/export/csv/?{params}").streaming_content)
+
+    exported = list(csv.DictReader(io.StringIO(content.decode("utf-8"))))
+    assert [row["Equipment Name"] for row in exported] == [row["Equipment Name"] for row in query["data"]]
+    assert len(exported) == query["count"]
+
+
+def test_index_is_only_built_while_a_filtered_export_streams(api, upload_id):
+    discard_index(upload_id)
+    response = api.get(f"/api/uploads/{upload_id}/export/csv/?type=Pump")
+    assert cached_keys(upload_id) == []
+
+    next(iter(response.streaming_content))
+    assert len(cached_keys(upload_id)) == 1
+
+
+def test_plain_export_never_builds_the_index(api, upload_id):
+    discard_index(upload_id)
+    content = b"".join(api.get(f"/api/uploads/{upload_id}/export/csv/").streaming_content)
+
+    assert content.count(b"\n") == 301
+    assert cached_keys(upload_id) == []
@@ -0,0 +1,173 @@
+import os
+import sys
+
+import pytest
+
+pytest.importorskip("rest_framework")
+pd = pytest.importorskip("pandas")
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "backend"))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+
+from equipment.fleet import merge_partials  # noqa: E402
+
+COLUMNS = ["Equipment Name", "Type", "Flowrate", "Pressure", "Temperature"]
+
+# Two uploads of very different sizes, so the weightings disagree.
+SMALL = {
+    "total_equipment": 2,
+    "equipment_distribution": {"Pump": 2},
+    "flowrate_sum": 20.0, "flowrate_count": 2,
+    "pressure_sum": 10.0, "pressure_count": 2,
+    "temperature_sum": 0.0, "temperature_count": 0,
+}
+LARGE = {
+    "total_equipment": 8,
+    "equipment_distribution": {"Reactor": 6, "Pump": 2},
+    "flowrate_sum": 80.0, "flowrate_count": 8,
+    "pressure_sum": 14.0, "pressure_count": 7,
+    "temperature_sum": 800.0, "temperature_count": 8,
+}
+
+
+def test_merge_weights_every_row_equally():
+    stats = merge_partials([SMALL, LARGE], "rows")
+
+    assert stats["total_equipment"] == 10
+    assert stats["average_flowrate"] == 10.0
+    assert stats["average_pressure"] == 24.0 / 9
+    # Uploads without a column's values do not drag its average to zero.
+    assert stats["average_temperature"] == 100.0
+    assert list(stats["equipment_distribution"].items()) == [("Reactor", 6), ("Pump", 4)]
+    assert stats["equipment_share"] == {"Reactor": 0.6, "Pump": 0.4}
+
+
+def test_merge_weights_every_upload_equally():
+    stats = merge_partials([SMALL, LARGE], "uploads")
+
+    assert stats["total_equipment"] == 10
+    assert stats["average_flowrate"] == 10.0
+    assert stats["average_pressure"] == (5.0 + 2.0) / 2
+    assert stats["average_temperature"] == 100.0
+    assert list(stats["equipment_distribution"].items()) == [("Reactor", 6), ("Pump", 4)]
+    assert stats["equipment_share"] == {"Pump": 0.625, "Reactor": 0.375}
+
+
+def test_merge_of_nothing_is_zero():
+    stats = merge_partials([], "uploads")
+
+    assert stats["total_equipment"] == 0 and stats["average_flowrate"] == 0.0
+    assert stats["equipment_distribution"] == {} and stats["equipment_share"] == {}
+
+
+def post_upload(api, rows, name):
+    from django.core.files.uploadedfile import SimpleUploadedFile
+
+    text = pd.DataFrame(rows, columns=COLUMNS).to_csv(index=False)
+    return api.post("/api/upload/", {"file": SimpleUploadedFile(name, text.encode("utf-8"))}).json()["id"]
+
+
+def make_legacy(upload_id):
+    # Uploads stored before running aggregates existed have none of them.
+    from equipment.models import EquipmentUpload
+
+    EquipmentUpload.objects.filter(pk=upload_id).update(
+        equipment_distribution={},
+        **{f"{prefix}_{part}": 0 for prefix in ("flowrate", "pressure", "temperature") for part in ("sum", "count")},
+    )
+
+
+@pytest.fixture
+def parse_calls(monkeypatch):
+    from equipment import views
+
+    calls = []
+    parse_batch = views.parse_batch
+
+    def counting_parse(entries):
+        calls.append([entry["upload"].id for entry in entries])
+        return parse_batch(entries)
+
+    monkeypatch.setattr(views, "parse_batch", counting_parse)
+    return calls
+
+
+@pytest.fixture
+def legacy_uploads(api):
+    from equipment.models import EquipmentUpload
+
+    EquipmentUpload.objects.all().delete()
+    first = post_upload(api, [["P-1", "Pump", 10.0, 2.0, 100.0], ["R-1", "Reactor", 30.0, None, 120.0]], "a.csv")
+    second = post_upload(api, [["V-1", "Valve", 5.0, 1.0, 80.0]], "b.csv")
+    expected = api.get("/api/fleet/").json()["stats"]
+    make_legacy(first)
+    make_legacy(second)
+    return [first, second], expected
+
+
+def test_fleet_backfills_legacy_uploads_once(api, legacy_uploads, parse_calls):
+    from equipment.models import EquipmentUpload
+
+    upload_ids, expected = legacy_uploads
+
+    body = api.get("/api/fleet/").json()
+    assert body["backfilled"] == 2 and body["errors"] == []
+    assert body["stats"] == expected
+    assert sorted(parse_calls[0]) == sorted(upload_ids)
+
+    stored = EquipmentUpload.objects.get(pk=upload_ids[0])
+    assert stored.equipment_distribution == {"Pump": 1, "Reactor": 1}
+    assert (stored.pressure_sum, stored.pressure_count) == (2.0, 1)
+
+    again = api.get("/api/fleet/").json()
+    assert again["backfilled"] == 0 and again["stats"] == expected
+    assert len(parse_calls) == 1
+
+
+def test_backfill_rereads_uploads_appended_meanwhile(api, legacy_uploads, monkeypatch):
+    from equipment import views
+    from equipment.models import EquipmentUpload
+
+    upload_ids, _ = legacy_uploads
+    appended = {
+        "append_count": 1,
+        "total_equipment": 3,
+        "equipment_distribution": {"Pump": 3},
+        "flowrate_sum": 3.0,
+        "flowrate_count": 3,
+    }
+    parse_batch = views.parse_batch
+
+    def parse_while_appending(entries):
+        # An append lands while the CSVs are being parsed.
+        EquipmentUpload.objects.filter(pk=upload_ids[0]).update(**appended)
+        return parse_batch(entries)
+
+    monkeypatch.setattr(views, "parse_batch", parse_while_appending)
+    uploads = list(EquipmentUpload.objects.filter(pk__in=upload_ids).order_by("pk"))
+    assert views.backfill_partials(uploads) == []
+
+    # The append's aggregates win, both in the row and in memory.
+    stored = EquipmentUpload.objects.get(pk=upload_ids[0])
+    for upload in (uploads[0], stored):
+        assert upload.append_count == 1 and upload.total_equipment == 3
+        assert upload.equipment_distribution == {"Pump": 3}
+        assert (upload.flowrate_sum, upload.flowrate_count) == (3.0, 3)
+    assert uploads[1].equipment_distribution == {"Valve": 1}
+
+
+def test_backfill_reports_uploads_deleted_meanwhile(api, legacy_uploads, monkeypatch):
+    from equipment import views
+    from equipment.models import EquipmentUpload
+
+    upload_ids, _ = legacy_uploads
+    parse_batch = views.parse_batch
+
+    def parse_while_deleting(entries):
+        EquipmentUpload.objects.filter(pk=upload_ids[1]).delete()
+        return parse_batch(entries)
+
+    monkeypatch.setattr(views, "parse_batch", parse_while_deleting)
+    uploads = list(EquipmentUpload.objects.filter(pk__in=upload_ids).order_by("pk"))
+
+    assert views.backfill_partials(uploads) == [{"id": upload_ids[1], "error": "Upload was deleted"}]
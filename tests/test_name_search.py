@@ -0,0 +1,138 @@
+import os
+import random
+import sys
+
+import pytest
+
+pytest.importorskip("pandas")
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "backend"))
+
+import pandas as pd  # noqa: E402
+
+from equipment import search  # noqa: E402
+from equipment.dataset import EquipmentDataset  # noqa: E402
+
+WORDS = ["Pump", "Reactor", "Valve", "Heat-Exchanger", "Compressor", "Ümlaut", "İstanbul"]
+QUERIES = ["pump", "PUMP-1", "r", "ump-", "eactor", "-1", "1", "12", "xyz", "p", "ü", "i̇s", "stanbul-3", "tor-2", "  valve "]
+PAGES = [(20, 0), (50, 37), (7, 3), (5, 2990), (1000, 0)]
+
+
+def build(names):
+    frame = pd.DataFrame({
+        "Equipment Name": names,
+        "Type": ["Pump"] * len(names),
+        "Flowrate": 1.0,
+        "Pressure": 1.0,
+        "Temperature": 1.0,
+    })
+    dataset = EquipmentDataset(frame)
+    return search.NameSearchIndex(dataset.names, dataset.name_codes)
+
+
+def reference(names, query):
+    # Every matching row: prefix matches, then names merely containing the
+    # query, each alphabetical with equal names in row order.
+    query = query.strip().lower()
+    if not query:
+        return []
+    lowered = [(name.lower(), row) for row, name in enumerate(names) if name is not None]
+    prefix = sorted(item for item in lowered if item[0].startswith(query))
+    inner = sorted(item for item in lowered if query in item[0] and not item[0].startswith(query))
+    return [row for _, row in prefix + inner]
+
+
+def random_names(count, spread, seed=1):
+    rng = random.Random(seed)
+    names = [f"{rng.choice(WORDS)}-{rng.randint(0, spread)}" for _ in range(count)]
+    names[5] = None
+    return names
+
+
+def assert_matches(index, names, query, limit, offset):
+    ids, count, exact = index.search(query, limit, offset)
+    expected = reference(names, query)
+    page = expected[offset:offset + limit]
+    # Rows of equal names may come in any order; their names may not.
+    assert sorted(ids.tolist()) == sorted(page), (query, limit, offset)
+    assert [names[row].lower() for row in ids] == [names[row].lower() for row in page]
+    if exact:
+        assert count == len(expected), query
+    else:
+        assert count >= min(len(expected), offset + limit), query
+
+
+@pytest.mark.parametrize("spread", [10 ** 6, 400], ids=["distinct", "repeated"])
+def test_search_matches_brute_force(spread):
+    names = random_names(3000, spread)
+    index = build(names)
+
+    for query in QUERIES:
+        for limit, offset in PAGES:
+            assert_matches(index, names, query, limit, offset)
+
+
+def test_offset_paging_across_repeated_names():
+    names = random_names(3000, 40)
+    index = build(names)
+    assert index.code_rows is not None
+
+    for query in ["pump", "-1", "e"]:
+        expected = reference(names, query)
+        pages = []
+        for offset in range(0, len(expected) + 7, 7):
+            ids, count, exact = index.search(query, 7, offset)
+            pages += ids.tolist()
+        assert sorted(pages) == sorted(expected)
+        assert [names[row].lower() for row in pages] == [names[row].lower() for row in expected]
+        assert len(set(pages)) == len(pages)
+
+
+def test_names_whose_length_changes_when_lowercased():
+    # "İ" lowercases to two characters, shifting every later name's offsets.
+    names = ["İstanbul-1", "Pump-İ2", "Pump-3", "Reactor-İİ", "Valve-istanbul"] * 3
+    index = build(names)
+    assert len(index.lowered.text) > len("".join(dict.fromkeys(names)))
+
+    for query in ["i̇", "i̇stanbul", "pump-", "ump-3", "or-i̇i̇", "istanbul", "stanbul"]:
+        for limit, offset in [(20, 0), (2, 1)]:
+            assert_matches(index, names, query, limit, offset)
+
+
+def test_lexsort_fallback_matches_packed_keys(monkeypatch):
+    names = random_names(2000, 300)
+    packed = build(names)
+    monkeypatch.setattr(search, "PACKED_KEY_MAX", 0)
+    fallback = build(names)
+
+    assert (fallback.gram_keys == packed.gram_keys).all()
+    assert (fallback.posting_bounds == packed.posting_bounds).all()
+    assert (fallback.posting_rows == packed.posting_rows).all()
+    for query in QUERIES:
+        assert_matches(fallback, names, query, 20, 0)
+
+
+def test_large_alphabet_is_renumbered():
+    rng = random.Random(2)
+    names = ["".join(chr(0x4E00 + rng.randrange(3000)) for _ in range(6)) for _ in range(2000)]
+    index = build(names)
+    assert len(index.alphabet) > 2000
+
+    for name in rng.sample(names, 20):
+        for query in [name[:2], name[1:4], name[2:], name]:
+            assert_matches(index, names, query, 20, 0)
+    assert_matches(index, names, "鿿鿾", 20, 0)
+
+
+def test_count_is_exact_once_every_candidate_is_checked():
+    names = [f"Pump-{number}" for number in range(500)] + [f"Reactor-{number}" for number in range(500)]
+    index = build(names)
+
+    ids, count, exact = index.search("actor-4", 500, 0)
+    assert exact and count == len(reference(names, "actor-4")) == 111
+
+    # Page filled early: the estimate still covers it.
+    ids, count, exact = index.search("actor-", 20, 0)
+    assert len(ids) == 20 and not exact and count >= 20
+
+    ids, count, exact = index.search("zzz", 20, 0)
+    assert exact and count == 0 and not len(ids)
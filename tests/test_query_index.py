@@ -0,0 +1,185 @@
+import os
+import sys
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+np = pytest.importorskip("numpy")
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "backend"))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+
+from equipment.dataset import EquipmentDataset  # noqa: E402
+from equipment.indexes import DatasetIndex, _column_bound  # noqa: E402
+
+COLUMNS = ["Equipment Name", "Type", "Flowrate", "Pressure", "Temperature"]
+TYPES = ["Pump", "Reactor", "Valve", "Compressor"]
+
+
+@pytest.fixture(scope="module")
+def frame():
+    rng = np.random.default_rng(7)
+    size = 2000
+    # Flowrate is exact in float32 and gets narrowed; Pressure and
+    # Temperature are not and stay float64. Pressure has gaps.
+    pressure = np.round(rng.uniform(4, 7, size), 1)
+    pressure[rng.random(size) < 0.1] = np.nan
+    return pd.DataFrame({
+        "Equipment Name": [f"Unit-{row}" for row in range(size)],
+        "Type": rng.choice(TYPES, size),
+        "Flowrate": rng.integers(0, 400, size) * 0.25,
+        "Pressure": pressure,
+        "Temperature": np.round(rng.uniform(80, 140, size), 3),
+    })
+
+
+@pytest.fixture(scope="module")
+def index(frame):
+    return DatasetIndex(EquipmentDataset(frame))
+
+
+@pytest.fixture(scope="module")
+def upload_id(api):
+    from django.core.files.uploadedfile import SimpleUploadedFile
+
+    rows = [[f"Unit-{row}", TYPES[row % 4], float(row % 97), 5.0, 100.0] for row in range(1200)]
+    text = pd.DataFrame(rows, columns=COLUMNS).to_csv(index=False)
+    response = api.post("/api/upload/", {"file": SimpleUploadedFile("query.csv", text.encode("utf-8"))})
+    return response.json()["id"]
+
+
+def reference(frame, types=None, ranges=None):
+    mask = pd.Series(True, index=frame.index)
+    if types is not None:
+        mask &= frame["Type"].isin(types)
+    for column, (low, high) in (ranges or {}).items():
+        values = frame[column]
+        if low is not None:
+            mask &= values >= low
+        if high is not None:
+            mask &= values <= high
+    return set(np.flatnonzero(mask.to_numpy()).tolist())
+
+
+def select(index, types=None, ranges=None):
+    ids, _ = index.select(types, ranges)
+    return set(ids.tolist())
+
+
+def test_column_types_are_as_expected(index):
+    assert index.values["Flowrate"].dtype == np.float32
+    assert index.values["Pressure"].dtype == np.float64
+
+
+@pytest.mark.parametrize("types", [None, ["Pump"], ["Pump", "Valve"], ["Reactor", "Compressor", "Valve"]])
+@pytest.mark.parametrize("ranges", [
+    {},
+    {"Flowrate": (10.0, 50.0)},
+    {"Flowrate": (None, 20.3)},
+    {"Pressure": (5.2, 5.2)},
+    {"Pressure": (4.5, None), "Temperature": (None, 100.0)},
+    {"Flowrate": (12.25, 80.0), "Pressure": (5.0, 6.5), "Temperature": (95.5, 130.0)},
+    {"Temperature": (200.0, None)},
+])
+def test_select_matches_pandas(frame, index, types, ranges):
+    assert select(index, types, ranges) == reference(frame, types, ranges)
+
+
+def test_exact_bound_on_float64_column_keeps_equal_values(frame, index):
+    ranges = {"Pressure": (5.2, 5.2)}
+    assert select(index, ranges=ranges) == reference(frame, ranges=ranges)
+    assert len(reference(frame, ranges=ranges)) > 0
+
+
+@pytest.mark.parametrize("low, high", [
+    (12.25, 12.25),
+    (12.25 + 1e-9, None),
+    (None, 12.25 - 1e-9),
+    (12.25 - 1e-9, 12.25 + 1e-9),
+    (5.2, 5.2),
+    (-1e300, 1e300),
+    (1e300, None),
+])
+def test_float32_bounds_match_float64_comparison(frame, index, low, high):
+    ranges = {"Flowrate": (low, high)}
+    assert select(index, ranges=ranges) == reference(frame, ranges=ranges)
+
+
+def test_column_bound_nudges_only_inexact_bounds():
+    values = np.array([5.25], dtype=np.float32)
+
+    assert _column_bound(values, 5.25, lower=True) == np.float32(5.25)
+    assert _column_bound(values, 5.25, lower=False) == np.float32(5.25)
+    low = _column_bound(values, 5.2, lower=True)
+    high = _column_bound(values, 5.2, lower=False)
+    assert float(low) >= 5.2 and float(high) <= 5.2
+    assert np.nextafter(high, np.float32(np.inf)) == low
+    assert _column_bound(values.astype(np.float64), 5.2, lower=True) == 5.2
+
+
+def test_unknown_types_match_nothing(frame, index):
+    assert select(index, ["Heater"]) == set()
+    assert select(index, ["Heater"], {"Flowrate": (0.0, None)}) == set()
+    assert select(index, ["Heater", "Pump"]) == reference(frame, ["Pump"])
+
+
+def sorted_values(index, ids, column):
+    return index.values[column][ids].astype(np.float64)
+
+
+@pytest.mark.parametrize("descending", [False, True])
+@pytest.mark.parametrize("types, ranges", [
+    (None, {}),
+    (["Pump", "Valve"], {}),
+    (None, {"Pressure": (5.0, 6.0)}),
+    (None, {"Temperature": (90.0, 120.0)}),
+    (["Reactor"], {"Flowrate": (20.0, None)}),
+])
+def test_sort_matches_pandas_with_missing_values_last(frame, index, types, ranges, descending):
+    for column in ["Flowrate", "Pressure", "Temperature"]:
+        ids, sorted_by = index.select(types, ranges)
+        ordered = index.sort(ids, sorted_by, column, descending)
+
+        expected = frame.iloc[sorted(reference(frame, types, ranges))][column].sort_values(
+            ascending=not descending, kind="stable", na_position="last"
+        )
+        assert set(ordered.tolist()) == set(expected.index)
+        np.testing.assert_array_equal(sorted_values(index, ordered, column), expected.to_numpy())
+
+
+def test_descending_sort_keeps_missing_pressure_last(frame, index):
+    ids, sorted_by = index.select()
+    ordered = index.sort(ids, sorted_by, "Pressure", descending=True)
+    values = sorted_values(index, ordered, "Pressure")
+
+    missing = int(frame["Pressure"].isna().sum())
+    assert missing and np.isnan(values[-missing:]).all()
+    assert not np.isnan(values[:-missing]).any()
+    assert (np.diff(values[:-missing]) <= 0).all()
+
+
+@pytest.mark.parametrize("params, error", [
+    ("limit=abc", "limit and offset must be integers"),
+    ("offset=1.5", "limit and offset must be integers"),
+    ("limit=-1", "limit and offset must not be negative"),
+    ("offset=-5", "limit and offset must not be negative"),
+    ("pressure_min=high", "Invalid number for pressure_min: high"),
+    ("sort=name", "Cannot sort by name"),
+])
+def test_query_endpoint_rejects_invalid_parameters(api, upload_id, params, error):
+    response = api.get(f"/api/uploads/{upload_id}/query/?{params}")
+
+    assert response.status_code == 400
+    assert response.json()["error"] == error
+
+
+def test_query_endpoint_pages_and_caps_the_limit(api, upload_id):
+    full = api.get(f"/api/uploads/{upload_id}/query/?sort=flowrate&limit=5000").json()
+    assert len(full["data"]) == 1000 and full["count"] == 1200
+
+    page = api.get(f"/api/uploads/{upload_id}/query/?sort=flowrate&limit=7&offset=995").json()
+    assert len(page["data"]) == 7 and page["data"][:5] == full["data"][995:]
+
+    past = api.get(f"/api/uploads/{upload_id}/query/?offset=5000").json()
+    assert past["data"] == [] and past["count"] == 1200
+